@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+
+from posts import last_seen
+
+
+def new_posts(request):
+    """Счётчики новых постов для шапки из кэша; читаются, только если
+    шаблон к ним обратился.
+    """
+    return {
+        'new_posts': SimpleLazyObject(
+            lambda: last_seen.cached_new_posts(request.user)
+        )
+    }
@@ -0,0 +1,33 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from core.startup import profile_boot
+
+
+class Command(BaseCommand):
+    help = 'Показывает время старта WSGI-приложения и импорта модулей'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20)
+
+    def handle(self, *args, **options):
+        profile = profile_boot()
+        self.stdout.write('Этапы старта, мс:')
+        for phase, seconds in profile.phases.items():
+            self.stdout.write(f'  {phase:<12}{seconds * 1000:9.1f}')
+        packages = Counter()
+        for module in profile.imports:
+            packages[module.name.split('.')[0]] += module.self_time
+        self.stdout.write('Пакеты по собственному времени импорта, мс:')
+        for name, seconds in packages.most_common(options['top']):
+            self.stdout.write(f'  {seconds * 1000:9.1f}  {name}')
+        self.stdout.write('Модули по накопленному времени импорта, мс:')
+        slowest = sorted(
+            profile.imports, key=lambda module: module.cumulative,
+            reverse=True
+        )
+        for module in slowest[:options['top']]:
+            self.stdout.write(
+                f'  {module.cumulative * 1000:9.1f}  {module.name}'
+            )
@@ -0,0 +1,218 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import connection
+from django.http import FileResponse
+from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from .ratelimit import check_limits, measure_writes, write_latency
+
+# ManifestStaticFilesStorage вставляет в имя 12 символов md5.
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+SHORT_CACHE_CONTROL = 'public, max-age=60'
+ENCODINGS = (
+    ('br', 'br'),
+    ('gzip', 'gz'),
+)
+USER_CACHE_KEY = 'auth_user:{}'
+USER_CACHE_TIMEOUT: int = 60
+
+
+def accepted_encodings(request):
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    accepted = set()
+    for part in header.split(','):
+        coding, *params = (item.strip() for item in part.split(';'))
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    return accepted
+
+
+def precompressed_path(path, extension):
+    packed = f'{path}.{extension}'
+    return packed if os.path.isfile(packed) else None
+
+
+class PrecompressedStaticMiddleware:
+    """Отдаёт собранную статику из STATIC_ROOT до остальных middleware.
+
+    Выбирает сжатую копию по Accept-Encoding, а файлам с хэшем в имени
+    ставит кэширование на год: при изменении меняется и имя.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        prefix = settings.STATIC_URL
+        if (
+            not settings.DEBUG
+            and settings.STATIC_ROOT
+            and request.method in ('GET', 'HEAD')
+            and request.path.startswith(prefix)
+        ):
+            response = self.serve(request, request.path[len(prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        content_type, _ = mimetypes.guess_type(path)
+        accepted = accepted_encodings(request)
+        encoding = None
+        for coding, extension in ENCODINGS:
+            packed = coding in accepted and precompressed_path(path, extension)
+            if packed:
+                path, encoding = packed, coding
+                break
+        response = FileResponse(
+            open(path, 'rb'),
+            content_type=content_type or 'application/octet-stream'
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        response['Cache-Control'] = (
+            IMMUTABLE_CACHE_CONTROL if HASHED_NAME.search(name)
+            else SHORT_CACHE_CONTROL
+        )
+        return response
+
+
+def cached_user_key(user_id):
+    return USER_CACHE_KEY.format(user_id)
+
+
+def resolve_user(request):
+    """Как ``auth.get_user``, но берёт пользователя из кэша.
+
+    Проверки те же: бэкенд из сессии должен быть разрешён, а хэш
+    пароля в сессии — совпадать с текущим, иначе сессия сбрасывается.
+    Кэш используется, только если он общий для всех воркеров: иначе
+    смена пароля в одном процессе не сбросила бы копии в остальных.
+    """
+    if not settings.SHARED_CACHE:
+        return auth.get_user(request)
+    try:
+        user_id = auth._get_user_session_key(request)
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+    user = cache.get(cached_user_key(user_id))
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(cached_user_key(user.pk), user, USER_CACHE_TIMEOUT)
+        return user
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if not (session_hash and constant_time_compare(
+        session_hash, user.get_session_auth_hash()
+    )):
+        request.session.flush()
+        return AnonymousUser()
+    return user
+
+
+def get_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = resolve_user(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware без запроса пользователя в БД.
+
+    При общем кэше (settings.SHARED_CACHE) объект пользователя живёт в
+    нём USER_CACHE_TIMEOUT секунд и удаляется при любом сохранении
+    пользователя, в том числе при смене пароля или профиля (см.
+    core.signals).
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+
+
+def limit_keys(request):
+    keys = [('ip', request.META.get('REMOTE_ADDR', ''))]
+    if request.user.is_authenticated:
+        keys.append(('user', request.user.pk))
+    return keys
+
+
+def retry_response(request, template, status, retry_after):
+    response = render(
+        request, template, {'retry_after': retry_after}, status=status
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+class RateLimitMiddleware:
+    """Лимиты частоты для URL из settings.RATELIMITS.
+
+    Пока средняя задержка записи в БД выше OVERLOAD_WRITE_LATENCY,
+    запросы к URL из OVERLOAD_SHED получают 503, чтобы единственный
+    писатель SQLite успевал обслуживать основные записи.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with connection.execute_wrapper(measure_writes):
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if match is None or match.url_name is None:
+            return None
+        view_name = ':'.join(match.app_names + [match.url_name])
+        limit = settings.RATELIMITS.get(view_name)
+        if limit is None:
+            return None
+        rate, methods = limit
+        if request.method not in methods:
+            return None
+        if (
+            view_name in settings.OVERLOAD_SHED
+            and write_latency.value() > settings.OVERLOAD_WRITE_LATENCY
+        ):
+            return retry_response(
+                request, 'core/503.html', 503,
+                settings.OVERLOAD_RETRY_AFTER
+            )
+        retry_after = check_limits(view_name, limit_keys(request), rate)
+        if retry_after:
+            return retry_response(
+                request, 'core/429.html', 429, retry_after
+            )
+        return None
@@ -0,0 +1,121 @@
+"""Ограничение частоты запросов и сброс нагрузки.
+
+Лимиты задаются в ``settings.RATELIMITS`` по имени URL
+(``app_name:url_name``) и считаются фиксированными окнами отдельно для
+пользователя и для IP. Счётчик окна создаётся ``cache.add`` и растёт
+``cache.incr``: оба атомарны, поэтому параллельные запросы не проскочат
+сверх лимита. Корзине токенов нужно атомарно прочитать и записать пару
+(токены, время), а такой операции в API кэша нет, поэтому при гонке
+корзина пропускала лишние запросы. У окон своя погрешность: на границе
+двух окон можно успеть сделать до двух лимитов подряд. Для этих лимитов
+это приемлемо: они защищают от длительного потока запросов, а не от
+единичного всплеска.
+
+Счётчики лежат в кэше по умолчанию. С общим кэшем
+(``settings.SHARED_CACHE``) лимит общий для всех процессов, без него
+каждый процесс считает свой, и фактический лимит умножается на их число.
+"""
+import math
+import threading
+import time
+
+from django.core.cache import cache
+
+RATE_PERIODS = {
+    's': 1,
+    'm': 60,
+    'h': 60 * 60,
+    'd': 24 * 60 * 60,
+}
+LIMIT_KEY = 'ratelimit:{}:{}:{}'
+# За это время без новых измерений оценка задержки падает вдвое.
+LATENCY_HALF_LIFE: float = 5.0
+LATENCY_WEIGHT: float = 0.2
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60)."""
+    count, _, period = rate.partition('/')
+    return int(count), RATE_PERIODS[period]
+
+
+class FixedWindow:
+    def __init__(self, key, limit, period):
+        self.key = key
+        self.limit = limit
+        self.period = period
+
+    def consume(self):
+        """Учитывает запрос; возвращает 0 или сколько секунд ждать."""
+        now = time.time()
+        window = int(now // self.period)
+        key = f'{self.key}:{window}'
+        cache.add(key, 0, self.period)
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            # Ключ истёк между add и incr: окно только что началось.
+            cache.add(key, 1, self.period)
+            count = 1
+        if count <= self.limit:
+            return 0
+        return max(1, math.ceil((window + 1) * self.period - now))
+
+
+def check_limits(view_name, keys, rate):
+    """Проверяет все корзины запроса; возвращает Retry-After или 0."""
+    limit, period = parse_rate(rate)
+    retry_after = 0
+    for kind, value in keys:
+        window = FixedWindow(
+            LIMIT_KEY.format(view_name, kind, value), limit, period
+        )
+        retry_after = max(retry_after, window.consume())
+    return retry_after
+
+
+class WriteLatency:
+    """Скользящая оценка задержки записи в БД в этом процессе.
+
+    Пока запись сбрасывается, новых измерений нет, поэтому оценка
+    затухает со временем — иначе режим перегрузки не снялся бы никогда.
+    """
+
+    def __init__(self):
+        self._value = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _decayed(self, now):
+        elapsed = now - self._updated
+        return self._value * 0.5 ** (elapsed / LATENCY_HALF_LIFE)
+
+    def observe(self, seconds):
+        now = time.monotonic()
+        with self._lock:
+            current = self._decayed(now)
+            self._value = current + LATENCY_WEIGHT * (seconds - current)
+            self._updated = now
+
+    def value(self):
+        return self._decayed(time.monotonic())
+
+    def reset(self):
+        with self._lock:
+            self._value = 0.0
+            self._updated = time.monotonic()
+
+
+write_latency = WriteLatency()
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def measure_writes(execute, sql, params, many, context):
+    if not sql.lstrip()[:6].upper().startswith(WRITE_STATEMENTS):
+        return execute(sql, params, many, context)
+    started = time.monotonic()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        write_latency.observe(time.monotonic() - started)
@@ -0,0 +1,69 @@
+"""Замер времени старта воркера.
+
+Загрузка WSGI-приложения выполняется в отдельном интерпретаторе с
+``-X importtime``: так модули, уже импортированные текущим процессом,
+не искажают картину. Возвращаются длительности этапов и время импорта
+каждого модуля.
+"""
+import json
+import os
+import subprocess
+import sys
+from collections import namedtuple
+
+from django.conf import settings
+
+BOOT_SCRIPT = '''
+import json, time
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+imported = time.perf_counter()
+application = get_wsgi_application()
+ready = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+loaded = time.perf_counter()
+print(json.dumps({
+    'import': imported - start,
+    'apps_ready': ready - imported,
+    'urls': loaded - ready,
+    'total': loaded - start,
+}))
+'''
+
+ModuleImport = namedtuple('ModuleImport', 'name self_time cumulative')
+BootProfile = namedtuple('BootProfile', 'phases imports')
+
+
+def parse_importtime(output):
+    """Строки ``import time: self | cumulative | name`` в секундах."""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        if not self_time.strip().isdigit():
+            # Строка заголовка.
+            continue
+        imports.append(ModuleImport(
+            name.strip(),
+            int(self_time) / 1e6,
+            int(cumulative) / 1e6,
+        ))
+    return imports
+
+
+def profile_boot():
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT_SCRIPT],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return BootProfile(
+        json.loads(result.stdout.strip().splitlines()[-1]),
+        parse_importtime(result.stderr),
+    )
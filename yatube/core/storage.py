@@ -0,0 +1,137 @@
+"""Хранилище статики с хэшами в именах и заранее сжатыми копиями.
+
+Рядом с каждым хэшированным файлом ``collectstatic`` кладёт ``.gz`` и,
+если установлен пакет ``brotli``, ``.br``. Отдаёт их
+``core.middleware.PrecompressedStaticMiddleware``.
+"""
+import gzip
+import hashlib
+import os
+import posixpath
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.ico', '.txt', '.json', '.xml', '.map',
+)
+# Файлы меньше этого размера сжимать бессмысленно.
+MIN_COMPRESS_SIZE: int = 256
+
+
+def compressors():
+    yield 'gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield 'br', brotli.compress
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        compressed = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if (
+                not dry_run
+                and isinstance(hashed_name, str)
+                and hashed_name not in compressed
+                and hashed_name.endswith(COMPRESSIBLE_EXTENSIONS)
+            ):
+                self.compress(hashed_name)
+                compressed.add(hashed_name)
+            yield name, hashed_name, processed
+
+    def compress(self, name):
+        with self.open(name) as original:
+            data = original.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        for extension, compress in compressors():
+            packed = compress(data)
+            if len(packed) >= len(data):
+                continue
+            packed_name = f'{name}.{extension}'
+            if self.exists(packed_name):
+                self.delete(packed_name)
+            self._save(packed_name, ContentFile(packed))
+
+
+class FileAlreadyStored(Exception):
+    pass
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, где имя файла — sha256 его содержимого.
+
+    С ``directory='posts'`` файл ``photo.jpg`` сохраняется как
+    ``posts/ab/cd/abcd...ef.jpg`` независимо от каталога в исходном имени,
+    поэтому уже хэшированное имя при повторном сохранении не уходит
+    глубже. Одинаковые загрузки занимают место один раз, а два уровня
+    подкаталогов не дают одному каталогу разрастись до сотен тысяч
+    файлов. Учёт ссылок на файлы ведёт вызывающий код.
+
+    Повторная загрузка обновляет время изменения файла: сборщик мусора
+    не трогает недавно изменённые файлы, пока загрузивший их запрос
+    не успел записать на них ссылку.
+    """
+
+    HASHED_NAME = re.compile(
+        r'(?P<first>[0-9a-f]{2})/(?P<second>[0-9a-f]{2})/'
+        r'(?P<digest>[0-9a-f]{64})(\.[^/]*)?'
+    )
+
+    def __init__(self, directory='', **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+
+    def is_hashed(self, name):
+        """Имя уже в адресации по содержимому этого хранилища."""
+        prefix = f'{self.directory}/' if self.directory else ''
+        if not name.startswith(prefix):
+            return False
+        match = self.HASHED_NAME.fullmatch(name[len(prefix):])
+        return bool(match) and match['digest'].startswith(
+            match['first'] + match['second']
+        )
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(
+            self.directory,
+            hexdigest[:2],
+            hexdigest[2:4],
+            hexdigest + extension
+        )
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        try:
+            os.utime(self.path(name))
+            return name
+        except FileNotFoundError:
+            pass
+        try:
+            return self._save(name, content)
+        except FileAlreadyStored:
+            return name
+
+    def get_available_name(self, name, max_length=None):
+        # Совпадение имён означает совпадение содержимого: файл уже
+        # записал параллельный запрос, новое имя не нужно.
+        raise FileAlreadyStored(name)
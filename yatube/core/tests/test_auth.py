@@ -0,0 +1,82 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+
+@override_settings(
+    SHARED_CACHE=True,
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+)
+class CachedAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='Ivan', password='pass')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def queries(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        return [query['sql'] for query in queries]
+
+    def test_logged_in_index_runs_only_feed_queries(self):
+        """Для авторизованного index не читает сессию и пользователя из БД"""
+        url = reverse('posts:index')
+        guest_client = Client()
+        self.authorized_client.get(url)
+        guest_client.get(url)
+        self.assertEqual(
+            self.queries(self.authorized_client, url),
+            self.queries(guest_client, url)
+        )
+
+    def test_password_change_invalidates_cached_user(self):
+        """После смены пароля старая сессия перестаёт действовать"""
+        url = reverse('posts:post_create')
+        self.assertEqual(self.authorized_client.get(url).status_code, 200)
+        self.user.set_password('new-pass')
+        self.user.save()
+        self.assertEqual(self.authorized_client.get(url).status_code, 302)
+
+    def test_profile_change_is_visible(self):
+        """Изменение профиля сразу видно в request.user"""
+        url = reverse('posts:index')
+        self.authorized_client.get(url)
+        User.objects.filter(pk=self.user.pk).update(first_name='Старое')
+        self.user.first_name = 'Иван'
+        self.user.save()
+        response = self.authorized_client.get(url)
+        self.assertEqual(response.context['user'].first_name, 'Иван')
+
+
+class ProcessLocalCacheTests(TestCase):
+    """Без общего кэша пользователь каждый раз читается из БД."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='Ivan', password='pass')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_user_not_cached(self):
+        """Изменение в обход сигналов (другой воркер) сразу видно"""
+        url = reverse('posts:index')
+        self.authorized_client.get(url)
+        User.objects.filter(pk=self.user.pk).update(first_name='Другой')
+        response = self.authorized_client.get(url)
+        self.assertEqual(response.context['user'].first_name, 'Другой')
+
+    def test_password_change_elsewhere_ends_session(self):
+        """Смена пароля без сигналов всё равно сбрасывает сессию"""
+        url = reverse('posts:post_create')
+        self.authorized_client.get(url)
+        self.user.set_password('new-pass')
+        User.objects.filter(pk=self.user.pk).update(
+            password=self.user.password
+        )
+        self.assertEqual(self.authorized_client.get(url).status_code, 302)
@@ -0,0 +1,91 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from http import HTTPStatus
+from unittest import mock
+
+from core.ratelimit import write_latency
+from posts.models import Post
+
+User = get_user_model()
+
+RATELIMITS = {
+    'posts:add_comment': ('2/m', ('POST',)),
+    'posts:profile_follow': ('100/m', ('GET', 'POST')),
+    'users:signup': ('1/h', ('POST',)),
+}
+
+
+@override_settings(RATELIMITS=RATELIMITS)
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.author = User.objects.create_user(username='Igor')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        write_latency.reset()
+        self.addCleanup(write_latency.reset)
+        self.addCleanup(cache.clear)
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    @mock.patch('core.ratelimit.time.time', return_value=60 * 1000 + 30)
+    def test_limit_returns_429_with_retry_after(self, _):
+        """Сверх лимита запрос получает 429 и Retry-After до конца окна"""
+        url = reverse('posts:add_comment', kwargs={'post_id': self.post.id})
+        for _ in range(2):
+            response = self.authorized_client.post(url, {'text': 'Текст'})
+            self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = self.authorized_client.post(url, {'text': 'Текст'})
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '30')
+
+    def test_limit_applies_only_to_listed_methods(self):
+        """GET формы регистрации не расходует лимит"""
+        url = reverse('users:signup')
+        for _ in range(3):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.client.post(url, {})
+        response = self.client.post(url, {})
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+
+    def test_limit_is_per_ip(self):
+        """Лимит по IP действует и на разных пользователей"""
+        url = reverse('users:signup')
+        self.client.post(url, {}, REMOTE_ADDR='10.0.0.1')
+        response = self.client.post(url, {}, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        response = self.client.post(url, {}, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+
+    def test_next_window_resets_limit(self):
+        """В следующем окне лимит начинается заново"""
+        url = reverse('users:signup')
+        with mock.patch('core.ratelimit.time.time', return_value=3600.0):
+            self.client.post(url, {})
+            response = self.client.post(url, {})
+            self.assertEqual(
+                response.status_code, HTTPStatus.TOO_MANY_REQUESTS
+            )
+        with mock.patch('core.ratelimit.time.time', return_value=7200.0):
+            response = self.client.post(url, {})
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_overload_sheds_non_essential_writes(self):
+        """При медленной записи второстепенные запросы получают 503"""
+        write_latency.observe(60)
+        response = self.authorized_client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'Igor'})
+        )
+        self.assertEqual(
+            response.status_code, HTTPStatus.SERVICE_UNAVAILABLE
+        )
+        self.assertIn('Retry-After', response)
+        response = self.authorized_client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
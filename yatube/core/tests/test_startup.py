@@ -0,0 +1,39 @@
+from django.test import SimpleTestCase
+
+from core.startup import parse_importtime, profile_boot
+
+# Запас на медленные машины CI: локально старт занимает ~0,4 с.
+STARTUP_BUDGET: float = 2.0
+# Нужны только при обработке картинок, а не при старте воркера.
+LAZY_MODULES = ('PIL', 'sorl.thumbnail.engines')
+
+
+class StartupTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.profile = profile_boot()
+
+    def test_boot_fits_budget(self):
+        """WSGI-приложение стартует быстрее бюджета"""
+        self.assertLess(self.profile.phases['total'], STARTUP_BUDGET)
+
+    def test_heavy_modules_are_lazy(self):
+        """Pillow и движок sorl не импортируются при старте"""
+        imported = {module.name for module in self.profile.imports}
+        for name in LAZY_MODULES:
+            with self.subTest(module=name):
+                self.assertFalse({
+                    module for module in imported
+                    if module == name or module.startswith(name + '.')
+                })
+
+    def test_parse_importtime(self):
+        """Разбор вывода -X importtime"""
+        imports = parse_importtime(
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       150 |        300 |   posts.views\n'
+        )
+        self.assertEqual(len(imports), 1)
+        self.assertEqual(imports[0].name, 'posts.views')
+        self.assertAlmostEqual(imports[0].cumulative, 0.0003)
@@ -0,0 +1,60 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+
+class PrecompressedStaticTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.static_root = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        cls.static_settings = override_settings(
+            STATIC_ROOT=cls.static_root,
+            STATICFILES_STORAGE=(
+                'core.storage.CompressedManifestStaticFilesStorage'
+            ),
+        )
+        cls.static_settings.enable()
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.static_settings.disable()
+        shutil.rmtree(cls.static_root, ignore_errors=True)
+
+    def test_collectstatic_writes_gzip_sibling(self):
+        """collectstatic кладёт .gz рядом с хэшированным файлом"""
+        hashed = staticfiles_storage.stored_name('css/bootstrap.min.css')
+        path = os.path.join(self.static_root, hashed)
+        with open(path, 'rb') as original, open(f'{path}.gz', 'rb') as gz:
+            self.assertEqual(gzip.decompress(gz.read()), original.read())
+
+    def test_middleware_serves_precompressed_file(self):
+        """Сжатая копия выбирается по Accept-Encoding"""
+        url = staticfiles_storage.url('css/bootstrap.min.css')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_middleware_serves_identity_without_accept_encoding(self):
+        """Без Accept-Encoding отдаётся исходный файл"""
+        url = staticfiles_storage.url('css/bootstrap.min.css')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn(b'bootstrap', b''.join(response.streaming_content))
+
+    def test_unhashed_name_is_not_immutable(self):
+        """Файл без хэша в имени кэшируется ненадолго"""
+        response = self.client.get(
+            settings.STATIC_URL + 'css/bootstrap.min.css'
+        )
+        self.assertNotIn('immutable', response['Cache-Control'])
@@ -1,23 +1,104 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
 
 from .models import Group, Post, Comment
+from .pagination import parse_id
 
+# Начиная с этого числа строк оценке из статистики можно доверять.
+COUNT_LIMIT: int = 10000
 
-class PostAdmin(admin.ModelAdmin):
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator без точного COUNT(*) по всей таблице.
+
+    Для PostgreSQL без фильтров берёт оценку из статистики планировщика,
+    если таблица не меньше COUNT_LIMIT строк. В остальных случаях считает
+    точно: усечённый счёт дал бы неверное число страниц.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] >= COUNT_LIMIT:
+                return int(row[0])
+        return queryset.order_by().count()
+
+
+class AuthorSearchMixin:
+    """Поиск по началу имени автора.
+
+    Стандартный ``^`` в search_fields сравнивает без учёта регистра
+    через UPPER() и не попадает в индекс на username, а LIKE по префиксу
+    с учётом регистра этот индекс использует.
+    """
+
+    search_fields = ('author__username',)
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(
+            author__username__startswith=search_term
+        ), False
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug', 'posts_count', 'last_post_date',)
+    search_fields = ('title', 'slug',)
+    empty_value_display = '-пусто-'
+
+
+class PostAdmin(AuthorSearchMixin, admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
-    list_editable = ('group',)
-    search_fields = ('text',)
+    list_select_related = ('author', 'group',)
+    search_fields = ('text', 'author__username',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
+    autocomplete_fields = ('author', 'group',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Автора ищем по началу имени, текст — по вхождению во всех постах.
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(
+            Q(author__username__startswith=search_term)
+            | Q(text__icontains=search_term)
+        ), False
+
 
-class CommentAdmin(admin.ModelAdmin):
-    list_display = ('post', 'author', 'text', 'created',)
+class CommentAdmin(AuthorSearchMixin, admin.ModelAdmin):
+    list_display = ('pk', 'post', 'author', 'text', 'created',)
+    list_select_related = ('post', 'author',)
     list_filter = ('created',)
-    search_fields = ('author', 'post')
+    date_hierarchy = 'created'
+    autocomplete_fields = ('post', 'author',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Число ищем как id поста по индексу, остальное — как имя автора.
+        post_id = parse_id(search_term.strip())
+        if post_id is not None:
+            return queryset.filter(post_id=post_id), False
+        return super().get_search_results(request, queryset, search_term)
+
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
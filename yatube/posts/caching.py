@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.cache import cache
+
+GENERATION_KEY = 'generation:{}'
+# Без общего кэша сдвиг поколения видит только свой процесс: остальные
+# отдают старое не дольше этого срока.
+LOCAL_TIMEOUT: int = 60
+
+
+def get_generation(name):
+    """Возвращает текущее поколение группы ключей кэша."""
+    return cache.get_or_set(GENERATION_KEY.format(name), 1, None)
+
+
+def get_generations(names):
+    """Поколения нескольких групп ключей одним обращением к кэшу."""
+    keys = {GENERATION_KEY.format(name): name for name in names}
+    found = cache.get_many(keys)
+    generations = {keys[key]: value for key, value in found.items()}
+    for key in keys.keys() - found.keys():
+        cache.add(key, 1, None)
+        generations[keys[key]] = cache.get(key, 1)
+    return generations
+
+
+def bump_generation(name):
+    """Сдвигает поколение: все ключи прошлого поколения становятся
+    недоступны без перебора и удаления каждого из них.
+    """
+    key = GENERATION_KEY.format(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def versioned_timeout(timeout):
+    """Срок жизни ключа, версионированного поколением."""
+    if settings.SHARED_CACHE:
+        return timeout
+    return min(timeout, LOCAL_TIMEOUT)
@@ -0,0 +1,79 @@
+"""Кэширование карточек постов в лентах («матрёшка»).
+
+Страница ленты кэшируется целиком на короткое время, а внутри неё
+каждая карточка кэшируется отдельно под ключом из id поста, времени
+его изменения и поколений автора и группы. Ключи всех карточек
+страницы читаются одним ``get_many``; заново рендерятся только
+изменившиеся посты, а устаревшие ключи просто истекают.
+"""
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from . import thumbnails
+from .caching import bump_generation, get_generations
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+CARD_TIMEOUT: int = 60 * 60 * 24
+
+
+def author_generation(author_id):
+    return f'author:{author_id}'
+
+
+def group_generation(group_id):
+    return f'group:{group_id}'
+
+
+def card_keys(posts):
+    names = set()
+    for post in posts:
+        names.add(author_generation(post.author_id))
+        if post.group_id is not None:
+            names.add(group_generation(post.group_id))
+    generations = get_generations(names)
+    keys = {}
+    for post in posts:
+        group = 'none'
+        if post.group_id is not None:
+            group = '{}.{}'.format(
+                post.group_id, generations[group_generation(post.group_id)]
+            )
+        keys[post] = 'post_card:{}:{}:{}:{}'.format(
+            post.pk,
+            post.updated.timestamp(),
+            generations[author_generation(post.author_id)],
+            group,
+        )
+    return keys
+
+
+def render_cards(posts):
+    """Список HTML карточек ``posts``; рендерит только промахи кэша."""
+    posts = list(posts)
+    keys = card_keys(posts)
+    cards = cache.get_many(list(keys.values()))
+    missing = [post for post in posts if keys[post] not in cards]
+    if missing:
+        prefetch_related_objects(missing, 'author', 'group')
+        try:
+            thumbnails.prefetch_thumbnails(missing)
+        except Exception:
+            # Без предзагрузки каждый пост найдёт миниатюру сам.
+            thumbnails.logger.exception('Thumbnail prefetch failed')
+        rendered = {
+            keys[post]: render_to_string(CARD_TEMPLATE, {'post': post})
+            for post in missing
+        }
+        cache.set_many(rendered, CARD_TIMEOUT)
+        cards.update(rendered)
+    return [mark_safe(cards[keys[post]]) for post in posts]
+
+
+def author_changed(author_id):
+    bump_generation(author_generation(author_id))
+
+
+def group_changed(group_id):
+    bump_generation(group_generation(group_id))
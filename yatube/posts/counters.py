@@ -0,0 +1,140 @@
+"""Буферизованный счётчик просмотров постов.
+
+Просмотр только увеличивает счётчик в памяти процесса. Накопленные
+приращения записываются в ``Post.views`` пачкой, когда их набирается
+``VIEW_COUNTER_FLUSH_THRESHOLD`` или проходит
+``VIEW_COUNTER_FLUSH_INTERVAL`` секунд, а также при штатной остановке
+процесса. При аварийном падении теряется не больше одной пачки.
+
+Запись идёт в фоновом потоке, чтобы запрос, переполнивший буфер, не ждал
+сотню UPDATE. Таймера нет: интервал проверяется только при очередном
+просмотре, так что в простаивающем процессе буфер лежит до следующего
+просмотра или до остановки.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import F
+
+from . import trending
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    def __init__(self, threshold=None, interval=None):
+        self.threshold = threshold
+        self.interval = interval
+        self._pending = Counter()
+        self._hits = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._flushing = False
+
+    def get_threshold(self):
+        return self.threshold or settings.VIEW_COUNTER_FLUSH_THRESHOLD
+
+    def get_interval(self):
+        return self.interval or settings.VIEW_COUNTER_FLUSH_INTERVAL
+
+    def hit(self, post_id):
+        with self._lock:
+            self._pending[post_id] += 1
+            self._hits += 1
+            due = not self._flushing and (
+                self._hits >= self.get_threshold()
+                or time.monotonic() - self._last_flush >= self.get_interval()
+            )
+            if due:
+                self._flushing = True
+        if due:
+            self.flush_async()
+
+    def flush_async(self):
+        """Запускает запись буфера в фоновом потоке и возвращает поток."""
+        thread = threading.Thread(target=self._flush_in_background)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('View counter flush failed')
+        finally:
+            with self._lock:
+                self._flushing = False
+            # У потока своё соединение с БД, его нужно закрыть самим.
+            connection.close()
+
+    def pending(self, post_id):
+        """Просмотры, ещё не записанные в БД."""
+        return self._pending.get(post_id, 0)
+
+    def reset(self):
+        """Отбрасывает буфер без записи в БД."""
+        with self._lock:
+            self._pending.clear()
+            self._hits = 0
+
+    def total(self, post):
+        """Просмотры поста с учётом буфера.
+
+        Считается до ``hit()``: фоновая запись может обнулить буфер раньше,
+        чем обновится уже загруженный ``post``.
+        """
+        return post.views + self.pending(post.pk)
+
+    def flush(self):
+        """Записывает накопленные приращения; возвращает число постов."""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._hits = 0
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        # Посты с одинаковым приращением обновляются одним UPDATE.
+        by_delta = defaultdict(list)
+        for post_id, delta in pending.items():
+            by_delta[delta].append(post_id)
+        while by_delta:
+            delta, post_ids = by_delta.popitem()
+            try:
+                Post.objects.filter(pk__in=post_ids).update(
+                    views=F('views') + delta
+                )
+            except DatabaseError:
+                # Незаписанное вернём в буфер до следующей попытки.
+                by_delta[delta] = post_ids
+                with self._lock:
+                    self._pending.update({
+                        post_id: delta
+                        for delta, post_ids in by_delta.items()
+                        for post_id in post_ids
+                    })
+                raise
+        existing = Post.objects.filter(
+            pk__in=list(pending)
+        ).values_list('pk', flat=True)
+        for post_id in existing:
+            trending.record(post_id, 'view', pending[post_id])
+        return len(pending)
+
+
+view_counter = ViewCounter()
+
+
+@atexit.register
+def flush_on_exit():
+    # При остановке процесса БД может быть уже недоступна.
+    try:
+        view_counter.flush()
+    except Exception:
+        pass
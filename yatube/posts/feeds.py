@@ -0,0 +1,174 @@
+"""RSS и Atom для сайта, групп и авторов.
+
+Готовый ответ фида кэшируется по адресу сайта и пути запроса: ссылки
+в фиде абсолютные. Ключ версионируется поколением пути, которое
+сдвигают сигналы, когда меняется пост из этого фида; путь берётся в
+URL-кодировке, как его возвращает ``reverse()``. Без общего кэша сдвиг
+виден только своему процессу, поэтому ответ живёт недолго. Опрос фида
+агрегатором стоит двух чтений кэша, а при совпадении ETag или
+Last-Modified сервер отвечает 304 без тела.
+"""
+from hashlib import md5
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.encoding import escape_uri_path
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+from django.utils.text import Truncator
+
+from .caching import bump_generation, get_generation, versioned_timeout
+from .models import Group, Post, User
+from .rows import post_rows
+
+FEED_ITEMS: int = 20
+FEED_TIMEOUT: int = 60 * 60 * 24
+FEED_KEY = 'feed:{}{}'
+TITLE_WORDS: int = 10
+
+
+def generation_name(path):
+    return f'feed:{path}'
+
+
+class LatestPostsFeed(Feed):
+    title = 'Yatube: последние записи'
+    description = 'Последние записи на сайте Yatube'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def get_posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        # Фиду нужны несколько полей: строки вместо моделей.
+        return list(post_rows(self.get_posts(obj)[:FEED_ITEMS]))
+
+    def item_title(self, item):
+        return Truncator(item.text).words(TITLE_WORDS)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', kwargs={'post_id': item.pk})
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_categories(self, item):
+        return (item.group.title,) if item.group else ()
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return f'Yatube: записи группы {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_list', kwargs={'slug': obj.slug})
+
+    def get_posts(self, obj):
+        return obj.posts.all()
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return obj.description
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Yatube: записи {obj.get_full_name() or obj.username}'
+
+    def description(self, obj):
+        return f'Последние записи пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', kwargs={'username': obj.username})
+
+    def get_posts(self, obj):
+        return obj.posts.all()
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = AuthorPostsFeed.description
+
+
+def cached_feed(feed):
+    """Оборачивает фид кэшем готового ответа и условным GET."""
+    def view(request, **kwargs):
+        # request.path уже декодирован, а invalidate() получает пути из
+        # reverse() в URL-кодировке.
+        path = escape_uri_path(request.path)
+        key = FEED_KEY.format(request.build_absolute_uri('/')[:-1], path)
+        version = get_generation(generation_name(path))
+        entry = cache.get(key, version=version)
+        if entry is None:
+            response = feed(request, **kwargs)
+            entry = (
+                response.content,
+                response['Content-Type'],
+                quote_etag(md5(response.content).hexdigest()),
+                # Кэш сбрасывается при каждом изменении, поэтому время
+                # сборки не раньше последнего изменения фида.
+                int(timezone.now().timestamp()),
+            )
+            cache.set(
+                key, entry, versioned_timeout(FEED_TIMEOUT), version=version
+            )
+        content, content_type, etag, last_modified = entry
+        response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return get_conditional_response(
+            request, etag=etag, last_modified=last_modified,
+            response=response,
+        )
+    return view
+
+
+site_rss = cached_feed(LatestPostsFeed())
+site_atom = cached_feed(LatestPostsAtomFeed())
+group_rss = cached_feed(GroupPostsFeed())
+group_atom = cached_feed(GroupPostsAtomFeed())
+profile_rss = cached_feed(AuthorPostsFeed())
+profile_atom = cached_feed(AuthorPostsAtomFeed())
+
+
+def invalidate(group_slugs=(), usernames=()):
+    """Сбрасывает фиды сайта и перечисленных групп и авторов."""
+    paths = [reverse('posts:index_rss'), reverse('posts:index_atom')]
+    for slug in group_slugs:
+        for name in ('posts:group_rss', 'posts:group_atom'):
+            paths.append(reverse(name, kwargs={'slug': slug}))
+    for username in usernames:
+        for name in ('posts:profile_rss', 'posts:profile_atom'):
+            paths.append(reverse(name, kwargs={'username': username}))
+    for path in paths:
+        bump_generation(generation_name(path))
@@ -1,5 +1,7 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
+from .images import normalize_image
 from .models import Post, Comment, Follow
 
 
@@ -18,6 +20,28 @@ class PostForm(forms.ModelForm):
             'text': 'Введите сообщение',
         }
 
+    image_metadata = None
+
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        # Новая загрузка; иначе это уже сохранённый файл или сброс.
+        if isinstance(image, UploadedFile):
+            image, self.image_metadata = normalize_image(image)
+        return image
+
+    def save(self, commit=True):
+        post = super().save(commit=False)
+        if self.image_metadata:
+            for field, value in self.image_metadata.items():
+                setattr(post, field, value)
+        elif not post.image:
+            post.image_width = post.image_height = None
+            post.image_placeholder = ''
+        if commit:
+            post.save()
+            self._save_m2m()
+        return post
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
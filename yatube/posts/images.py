@@ -0,0 +1,96 @@
+"""Нормализация картинок постов при загрузке.
+
+Размеры читаются из заголовка файла до декодирования пикселей, поэтому
+слишком большие картинки отклоняются дёшево. Картинка перекодируется,
+только если её нужно уменьшить или в ней есть EXIF; иначе сохраняются
+исходные байты. Заодно вычисляются размеры и крошечная размытая
+заглушка (LQIP), которую ленты показывают до загрузки миниатюры.
+"""
+import base64
+import posixpath
+from io import BytesIO
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+
+MAX_UPLOAD_SIDE: int = 12000
+MAX_UPLOAD_PIXELS: int = 40_000_000
+MAX_STORED_SIDE: int = 2048
+PLACEHOLDER_SIDE: int = 16
+PLACEHOLDER_QUALITY: int = 40
+JPEG_QUALITY: int = 85
+# Форматы, которые Pillow умеет только читать, перекодируются в PNG.
+FALLBACK_FORMAT = 'PNG'
+PNG_MODES = ('1', 'L', 'LA', 'I', 'P', 'RGB', 'RGBA')
+
+
+def check_dimensions(width, height):
+    if (
+        max(width, height) > MAX_UPLOAD_SIDE
+        or width * height > MAX_UPLOAD_PIXELS
+    ):
+        raise ValidationError(
+            'Картинка слишком большая: %(width)s×%(height)s.',
+            code='image_too_large',
+            params={'width': width, 'height': height},
+        )
+
+
+def make_placeholder(image):
+    """Data URI с JPEG-миниатюрой не больше ``PLACEHOLDER_SIDE``."""
+    from PIL import Image
+
+    preview = image.copy()
+    preview.thumbnail((PLACEHOLDER_SIDE, PLACEHOLDER_SIDE), Image.BILINEAR)
+    buffer = BytesIO()
+    preview.convert('RGB').save(
+        buffer, 'JPEG', quality=PLACEHOLDER_QUALITY
+    )
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return 'data:image/jpeg;base64,' + encoded
+
+
+def normalize_image(upload):
+    """Проверяет и при необходимости перекодирует загруженную картинку.
+
+    Возвращает файл для сохранения и словарь с полями метаданных поста.
+    """
+    # Pillow подгружается лениво: он нужен только при загрузке.
+    from PIL import Image, ImageOps
+
+    upload.seek(0)
+    image = Image.open(upload)
+    check_dimensions(*image.size)
+    image_format = image.format
+    animated = getattr(image, 'is_animated', False)
+    oversized = max(image.size) > MAX_STORED_SIDE
+    result = upload
+    # Анимацию не трогаем: перекодирование оставило бы один кадр.
+    if not animated and (oversized or 'exif' in image.info):
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((MAX_STORED_SIDE, MAX_STORED_SIDE), Image.LANCZOS)
+        options = {}
+        name = upload.name
+        Image.init()
+        if image_format not in Image.SAVE:
+            image_format = FALLBACK_FORMAT
+            name = posixpath.splitext(name)[0] + '.png'
+            if image.mode not in PNG_MODES:
+                image = image.convert('RGBA')
+        if image_format == 'JPEG':
+            options = {'quality': JPEG_QUALITY, 'optimize': True}
+            image = image.convert('RGB')
+        buffer = BytesIO()
+        # EXIF не передаётся в save и поэтому не попадает в файл.
+        image.save(buffer, image_format, **options)
+        result = ContentFile(buffer.getvalue(), name=name)
+    else:
+        image.load()
+    width, height = image.size
+    metadata = {
+        'image_width': width,
+        'image_height': height,
+        'image_placeholder': make_placeholder(image),
+    }
+    upload.seek(0)
+    return result, metadata
@@ -0,0 +1,105 @@
+"""Счётчик «новых постов с прошлого визита».
+
+Отметка времени последнего просмотра главной ленты и ленты подписок
+хранится в ``LastSeen``, но пишется в БД не чаще раза в
+``WRITE_INTERVAL``: свежее значение и время последней записи лежат в
+кэше. Новые посты считаются диапазоном по индексу ``pub_date`` (для
+подписок — по индексу (author, pub_date)) с LIMIT, поэтому запрос
+ограничен ``MAX_NEW + 1`` строками, сколько бы постов ни вышло.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from . import mutes
+from .models import LastSeen, Post
+
+FEEDS = ('index', 'follow')
+MAX_NEW: int = 99
+WRITE_INTERVAL = timedelta(minutes=5)
+MARKER_KEY = 'last_seen:{}'
+MARKER_TIMEOUT: int = 60 * 60 * 24
+COUNTS_KEY = 'new_posts:{}'
+COUNTS_TIMEOUT: int = 30
+
+
+def get_markers(user):
+    """{'index': время, 'follow': время, 'written': время записи}."""
+    key = MARKER_KEY.format(user.pk)
+    markers = cache.get(key)
+    if markers is None:
+        row = LastSeen.objects.filter(user=user).values(*FEEDS).first()
+        if row is None:
+            # Новому пользователю нечего показывать как «новое».
+            now = timezone.now()
+            markers = {'index': now, 'follow': now, 'written': None}
+        else:
+            markers = dict(row, written=min(row.values()))
+        cache.set(key, markers, MARKER_TIMEOUT)
+    return markers
+
+
+def mark_seen(user, feed, seen, now=None):
+    """Запоминает, что посты ленты до ``seen`` просмотрены.
+
+    Отметка только растёт; в БД пишется не чаще WRITE_INTERVAL.
+    """
+    now = now or timezone.now()
+    markers = get_markers(user)
+    if seen <= markers[feed] and markers['written'] is not None:
+        return
+    markers[feed] = max(markers[feed], seen)
+    written = markers['written']
+    if written is None or now - written >= WRITE_INTERVAL:
+        LastSeen.objects.update_or_create(
+            user=user,
+            defaults={name: markers[name] for name in FEEDS},
+        )
+        markers['written'] = now
+    cache.set(MARKER_KEY.format(user.pk), markers, MARKER_TIMEOUT)
+    cache.delete(COUNTS_KEY.format(user.pk))
+
+
+def feed_posts(request, feed):
+    posts = Post.objects.all()
+    if feed == 'follow':
+        posts = posts.filter(author__following__user=request.user)
+    return mutes.exclude_muted(posts, request)
+
+
+def count_new(posts, since):
+    return (
+        posts.filter(pub_date__gt=since).order_by()
+        .values('pk')[:MAX_NEW + 1].count()
+    )
+
+
+def label(count):
+    if count > MAX_NEW:
+        return f'{MAX_NEW}+'
+    return str(count) if count else ''
+
+
+def new_posts(request):
+    """{'index': '3', 'follow': '99+'}; пустая строка — новых нет."""
+    user = request.user
+    key = COUNTS_KEY.format(user.pk)
+    counts = cache.get(key)
+    if counts is None:
+        markers = get_markers(user)
+        counts = {
+            feed: label(count_new(feed_posts(request, feed), markers[feed]))
+            for feed in FEEDS
+        }
+        cache.set(key, counts, COUNTS_TIMEOUT)
+    return counts
+
+
+def cached_new_posts(user):
+    """Последние посчитанные счётчики без обращения к БД: шапка
+    страницы не должна стоить запросов, остальное досчитает опрос.
+    """
+    if not user.is_authenticated:
+        return {}
+    return cache.get(COUNTS_KEY.format(user.pk)) or {}
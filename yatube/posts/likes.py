@@ -0,0 +1,65 @@
+"""Лайки постов.
+
+Счётчик ``Post.likes_count`` меняется в той же транзакции, что и
+запись ``Like``, и только если запись действительно появилась или
+исчезла: уникальный индекс (user, post) делает повторные и
+параллельные запросы безопасными. Карточки постов кэшируются без
+лайков, поэтому состояние для страницы отдаётся отдельно,
+``like_states`` — двумя запросами на всю страницу.
+"""
+from django.db import transaction
+from django.db.models import F
+
+from .models import Like, Post
+
+
+def post_likes(post_id):
+    return (
+        Post.objects.filter(pk=post_id)
+        .values_list('likes_count', flat=True).first()
+    )
+
+
+def like(user, post_id):
+    """Ставит лайк; возвращает новое число лайков поста."""
+    with transaction.atomic():
+        _, created = Like.objects.get_or_create(user=user, post_id=post_id)
+        if created:
+            Post.objects.filter(pk=post_id).update(
+                likes_count=F('likes_count') + 1
+            )
+        return post_likes(post_id)
+
+
+def unlike(user, post_id):
+    """Снимает лайк; возвращает новое число лайков поста."""
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(user=user, post_id=post_id).delete()
+        if deleted:
+            Post.objects.filter(pk=post_id).update(
+                likes_count=F('likes_count') - 1
+            )
+        return post_likes(post_id)
+
+
+def liked_post_ids(user, post_ids):
+    """Какие из ``post_ids`` лайкнул ``user`` — одним запросом."""
+    if not user.is_authenticated or not post_ids:
+        return set()
+    return set(
+        Like.objects.filter(user=user, post_id__in=post_ids)
+        .values_list('post_id', flat=True)
+    )
+
+
+def like_states(user, post_ids):
+    """{id поста: {'likes': число, 'liked': bool}} для страницы."""
+    counts = dict(
+        Post.objects.filter(pk__in=post_ids)
+        .values_list('pk', 'likes_count')
+    )
+    liked = liked_post_ids(user, list(counts))
+    return {
+        post_id: {'likes': likes, 'liked': post_id in liked}
+        for post_id, likes in counts.items()
+    }
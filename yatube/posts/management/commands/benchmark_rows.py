@@ -0,0 +1,54 @@
+import gc
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.rows import post_rows
+
+
+def load_models(limit):
+    return list(Post.objects.select_related('author', 'group')[:limit])
+
+
+def load_rows(limit):
+    return list(post_rows(Post.objects.all()[:limit]))
+
+
+def measure(load, limit, repeat):
+    """Лучшее время и память, занятая результатом."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        load(limit)
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    result = load(limit)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), memory, len(result)
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает время и память моделей Post и строк PostRow'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        for name, load in (('Post', load_models), ('PostRow', load_rows)):
+            seconds, memory, count = measure(
+                load, options['rows'], options['repeat']
+            )
+            if not count:
+                self.stdout.write('Нет постов для замера')
+                return
+            per_thousand = 1000 / count
+            self.stdout.write(
+                f'{name:<8} строк: {count}, '
+                f'на 1000 строк: {seconds * per_thousand * 1000:.1f} мс, '
+                f'{memory * per_thousand / 1024:.0f} КиБ'
+            )
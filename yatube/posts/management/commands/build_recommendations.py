@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import BATCH_SIZE, build_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации авторов для всех пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько пользователей записывать за одну транзакцию'
+        )
+
+    def handle(self, *args, **options):
+        processed = build_recommendations(options['batch_size'])
+        self.stdout.write(f'Обработано пользователей: {processed}')
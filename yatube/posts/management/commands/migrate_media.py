@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts.media import collect_garbage, migrate_post_image
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит картинки постов в хранилище с адресацией по содержимому '
+        'и удаляет файлы, на которые не осталось ссылок'
+    )
+
+    def handle(self, *args, **options):
+        moved = 0
+        posts = Post.objects.exclude(image='').only('pk', 'image')
+        for post in posts.iterator():
+            if not post.image.storage.exists(post.image.name):
+                self.stderr.write(f'Нет файла: {post.image.name}')
+                continue
+            moved += migrate_post_image(post)
+        collected = collect_garbage()
+        self.stdout.write(
+            f'Перенесено файлов: {moved}, удалено без ссылок: {collected}'
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.stats import rebuild_group_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает количество постов и дату последнего поста групп'
+
+    def handle(self, *args, **options):
+        updated = rebuild_group_stats()
+        self.stdout.write(f'Обновлено групп: {updated}')
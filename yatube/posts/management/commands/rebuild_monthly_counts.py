@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.stats import rebuild_monthly_counts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает помесячную сводку постов для архива'
+
+    def handle(self, *args, **options):
+        rows = rebuild_monthly_counts()
+        self.stdout.write(f'Строк в сводке: {rows}')
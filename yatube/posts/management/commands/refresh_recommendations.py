@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import BATCH_SIZE, refresh_stale
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рекомендации пользователей, у которых изменились '
+        'подписки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Сколько пользователей записывать за одну транзакцию'
+        )
+
+    def handle(self, *args, **options):
+        processed = refresh_stale(options['batch_size'])
+        self.stdout.write(f'Обработано пользователей: {processed}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import prune_stale, rebuild_top
+
+
+class Command(BaseCommand):
+    help = 'Удаляет устаревшие оценки и перестраивает топ популярных постов'
+
+    def handle(self, *args, **options):
+        pruned = prune_stale()
+        top = rebuild_top()
+        self.stdout.write(
+            f'Удалено оценок: {pruned}, постов в топе: {len(top)}'
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from posts.warmup import (
+    HOT_GROUPS, HOT_PROFILES, INDEX_PAGES, WORKERS, warm_cache, warmup_urls
+)
+
+
+class Command(BaseCommand):
+    help = 'Прогревает кэш страниц и миниатюр после деплоя'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=INDEX_PAGES)
+        parser.add_argument('--groups', type=int, default=HOT_GROUPS)
+        parser.add_argument('--profiles', type=int, default=HOT_PROFILES)
+        parser.add_argument('--workers', type=int, default=WORKERS)
+
+    def handle(self, *args, **options):
+        urls = warmup_urls(
+            options['pages'], options['groups'], options['profiles']
+        )
+        statuses = warm_cache(urls, options['workers'])
+        failed = {
+            url: status for url, status in statuses.items() if status >= 400
+        }
+        for url, status in failed.items():
+            self.stderr.write(f'{url}: {status}')
+        self.stdout.write(
+            f'Прогрето страниц: {len(statuses) - len(failed)}, '
+            f'ошибок: {len(failed)}'
+        )
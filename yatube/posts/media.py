@@ -0,0 +1,88 @@
+"""Учёт ссылок на файлы картинок постов и сборка мусора.
+
+Картинки лежат в ``ContentAddressedStorage``, и один файл может
+принадлежать нескольким постам. Файл удаляется, только когда на него
+не осталось ссылок, и только после фиксации транзакции.
+
+Загрузка узнаёт о существующем файле раньше, чем её транзакция запишет
+ссылку на него. Поэтому файлы, изменённые за последние ``ORPHAN_GRACE``,
+не удаляются: их подберёт следующий ``collect_garbage``.
+"""
+from datetime import timedelta
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import File
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Post, StoredFile, post_images
+
+ORPHAN_GRACE = timedelta(hours=1)
+
+
+def acquire(name):
+    StoredFile.objects.get_or_create(name=name)
+    StoredFile.objects.filter(name=name).update(
+        references=F('references') + 1
+    )
+
+
+def release(name):
+    StoredFile.objects.filter(name=name, references__gt=0).update(
+        references=F('references') - 1
+    )
+    transaction.on_commit(lambda: delete_if_orphan(name))
+
+
+def is_recent(name):
+    try:
+        modified = post_images.get_modified_time(name)
+    except (FileNotFoundError, SuspiciousFileOperation):
+        return False
+    return modified > timezone.now() - ORPHAN_GRACE
+
+
+def delete_if_orphan(name):
+    """Удаляет файл, его миниатюры и запись, если ссылок нет."""
+    if Post.objects.filter(image=name).exists() or is_recent(name):
+        return False
+    deleted, _ = StoredFile.objects.filter(name=name, references=0).delete()
+    if not deleted:
+        return False
+    from sorl.thumbnail import default
+    from sorl.thumbnail.images import ImageFile
+    default.kvstore.delete(ImageFile(name, post_images))
+    try:
+        post_images.delete(name)
+    except SuspiciousFileOperation:
+        # Имя указывает за пределы MEDIA_ROOT: такой файл не наш.
+        return False
+    return True
+
+
+def collect_garbage():
+    """Удаляет все файлы без ссылок; возвращает их число."""
+    names = StoredFile.objects.filter(
+        references=0
+    ).values_list('name', flat=True)
+    return sum(delete_if_orphan(name) for name in list(names))
+
+
+def migrate_post_image(post):
+    """Переносит картинку поста в адресацию по содержимому.
+
+    Возвращает True, если файл был перенесён.
+    """
+    old_name = post.image.name
+    if post_images.is_hashed(old_name):
+        return False
+    with post_images.open(old_name) as original:
+        new_name = post_images.save(old_name, File(original))
+    if new_name == old_name:
+        return False
+    with transaction.atomic():
+        Post.objects.filter(pk=post.pk).update(image=new_name)
+        acquire(new_name)
+        release(old_name)
+    return True
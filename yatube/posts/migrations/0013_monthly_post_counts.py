@@ -0,0 +1,79 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:11
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+import django.db.models.deletion
+
+
+def fill_monthly_counts(apps, schema_editor):
+    MonthlyPostCount = apps.get_model('posts', 'MonthlyPostCount')
+    Post = apps.get_model('posts', 'Post')
+    rows = (
+        Post.objects.order_by()
+        .annotate(month=TruncMonth('pub_date'))
+        .values('month', 'author_id', 'group_id')
+        .annotate(total=Count('pk'))
+    )
+    MonthlyPostCount.objects.bulk_create(
+        MonthlyPostCount(
+            month=row['month'].date(),
+            author_id=row['author_id'],
+            group_id=row['group_id'],
+            count=row['total'],
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0012_post_image_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyPostCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Месяц')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+            ],
+            options={
+                'verbose_name': 'Постов за месяц',
+                'verbose_name_plural': 'Постов по месяцам',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date'], name='post_author_pub_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='monthlypostcount',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AddField(
+            model_name='monthlypostcount',
+            name='group',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='posts.Group', verbose_name='Группа'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlypostcount',
+            index=models.Index(fields=['group', 'month'], name='monthly_group_month_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlypostcount',
+            index=models.Index(fields=['author', 'month'], name='monthly_author_month_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlypostcount',
+            constraint=models.UniqueConstraint(fields=('month', 'author', 'group'), name='unique_monthly_post_count'),
+        ),
+        migrations.RunPython(
+            fill_monthly_counts, migrations.RunPython.noop
+        ),
+    ]
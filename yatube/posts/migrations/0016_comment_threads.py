@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_comment_paths(apps, schema_editor):
+    # Все старые комментарии — корни веток.
+    Comment = apps.get_model('posts', 'Comment')
+    comments = []
+    for comment in Comment.objects.only('id').iterator():
+        comment.path = str(comment.id).zfill(10)
+        comments.append(comment)
+    Comment.objects.bulk_update(comments, ['path'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_unique_follow'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ('path',), 'verbose_name': 'Комментарий', 'verbose_name_plural': 'Комментарии'},
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Глубина'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='posts.Comment', verbose_name='ответ на комментарий'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=99, verbose_name='Путь в ветке'),
+        ),
+        migrations.RunPython(fill_comment_paths, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='comment_post_path_idx'),
+        ),
+    ]
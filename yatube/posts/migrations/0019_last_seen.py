@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0018_mutes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LastSeen',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='last_seen', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('index', models.DateTimeField(verbose_name='Главная лента')),
+                ('follow', models.DateTimeField(verbose_name='Лента подписок')),
+            ],
+            options={
+                'verbose_name': 'Последний визит',
+                'verbose_name_plural': 'Последние визиты',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:00
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_stale_recommendations'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, storage=core.storage.ContentAddressedStorage(directory='posts'), upload_to='posts/', verbose_name='Картинка'),
+        ),
+    ]
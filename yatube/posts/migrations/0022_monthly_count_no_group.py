@@ -0,0 +1,38 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:02
+
+from django.db import migrations, models
+from django.db.models import Min, Sum
+
+
+def merge_duplicate_counts(apps, schema_editor):
+    MonthlyPostCount = apps.get_model('posts', 'MonthlyPostCount')
+    duplicates = (
+        MonthlyPostCount.objects.filter(group__isnull=True)
+        .values('month', 'author_id')
+        .annotate(first_id=Min('id'), total=Sum('count'), rows=models.Count('id'))
+        .filter(rows__gt=1)
+    )
+    for row in duplicates:
+        MonthlyPostCount.objects.filter(
+            month=row['month'], author_id=row['author_id'], group__isnull=True
+        ).exclude(id=row['first_id']).delete()
+        MonthlyPostCount.objects.filter(id=row['first_id']).update(
+            count=row['total']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_post_images_directory'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            merge_duplicate_counts, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='monthlypostcount',
+            constraint=models.UniqueConstraint(condition=models.Q(group__isnull=True), fields=('month', 'author'), name='unique_monthly_post_count_no_group'),
+        ),
+    ]
@@ -1,7 +1,15 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 
+from core.storage import ContentAddressedStorage
+
 User = get_user_model()
+post_images = ContentAddressedStorage(directory='posts')
+
+# Глубже ответы прикрепляются к предку на последнем допустимом уровне.
+COMMENT_MAX_DEPTH: int = 8
+# Ширина сегмента пути: id, дополненный нулями, сортируется как строка.
+COMMENT_PATH_STEP: int = 10
 
 
 class Group(models.Model):
@@ -17,6 +25,19 @@ class Group(models.Model):
         'Описание',
         blank=True
     )
+    # Счётчики обновляются сигналами при сохранении и удалении постов,
+    # чтобы каталог групп не считал агрегаты на каждый запрос.
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+        editable=False
+    )
+    last_post_date = models.DateTimeField(
+        'Дата последнего поста',
+        null=True,
+        blank=True,
+        editable=False
+    )
 
     def __str__(self):
         return self.title
@@ -24,6 +45,16 @@ class Group(models.Model):
     class Meta:
         verbose_name = 'Группа пользователей'
         verbose_name_plural = 'Группы пользователя'
+        indexes = (
+            models.Index(
+                fields=('-posts_count', '-id'),
+                name='group_posts_count_idx'
+            ),
+            models.Index(
+                fields=('-last_post_date', '-id'),
+                name='group_last_post_date_idx'
+            ),
+        )
 
 
 class Post(models.Model):
@@ -36,6 +67,8 @@ class Post(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    # Входит в ключ кэша карточки поста (posts.cards).
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -54,13 +87,56 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
-        blank=True
+        storage=post_images,
+        blank=True,
+        db_index=True
+    )
+    # Заполняются при загрузке (posts.images), чтобы ленты резервировали
+    # место и показывали заглушку, не открывая файл.
+    image_width = models.PositiveIntegerField(
+        'Ширина картинки',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        'Высота картинки',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    image_placeholder = models.TextField(
+        'Заглушка картинки',
+        blank=True,
+        editable=False
+    )
+    # Пишется пачками из буфера posts.counters, а не на каждый просмотр.
+    views = models.PositiveIntegerField(
+        'Просмотры',
+        default=0,
+        editable=False
+    )
+    # Меняется через F() вместе с записью Like, см. posts.likes.
+    likes_count = models.PositiveIntegerField(
+        'Лайки',
+        default=0,
+        editable=False
     )
 
     class Meta:
         verbose_name = 'Пост пользователя'
         verbose_name_plural = 'Посты пользователя'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('group', '-pub_date'),
+                name='post_group_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
@@ -85,16 +161,69 @@ class Comment(models.Model):
     )
     created = models.DateTimeField(
         verbose_name='Дата публикации комментария',
-        auto_now_add=True
+        auto_now_add=True,
+        db_index=True
+    )
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='replies',
+        verbose_name='ответ на комментарий'
+    )
+    # Материализованный путь: id предков и самого комментария через
+    # точку. Сортировка по нему выдаёт ветку обходом в глубину, а
+    # поддерево — это префикс пути.
+    path = models.CharField(
+        'Путь в ветке',
+        max_length=(COMMENT_PATH_STEP + 1) * (COMMENT_MAX_DEPTH + 1),
+        default='',
+        editable=False
+    )
+    depth = models.PositiveSmallIntegerField(
+        'Глубина',
+        default=0,
+        editable=False
     )
 
     def __str__(self):
         return self.text
 
     class Meta:
-        ordering = ('created',)
+        ordering = ('path',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', 'path'),
+                name='comment_post_path_idx'
+            ),
+        )
+
+    def save(self, *args, **kwargs):
+        if self.path:
+            return super().save(*args, **kwargs)
+        while (
+            self.parent is not None
+            and self.parent.depth >= COMMENT_MAX_DEPTH
+        ):
+            self.parent = self.parent.parent
+        self.depth = self.parent.depth + 1 if self.parent else 0
+        # Путь содержит собственный id, поэтому дописывается после вставки.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            segment = str(self.pk).zfill(COMMENT_PATH_STEP)
+            self.path = (
+                f'{self.parent.path}.{segment}' if self.parent else segment
+            )
+            Comment.objects.filter(pk=self.pk).update(path=self.path)
+
+    def subtree(self):
+        """Комментарий и все ответы на него одним запросом."""
+        return Comment.objects.filter(
+            post_id=self.post_id, path__startswith=self.path
+        )
 
 
 class Follow(models.Model):
@@ -110,3 +239,235 @@ class Follow(models.Model):
     class Meta:
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_follow'
+            ),
+        )
+
+
+class Like(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Пользователь'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Пост'
+    )
+    created = models.DateTimeField('Дата', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Лайк'
+        verbose_name_plural = 'Лайки'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_like'
+            ),
+        )
+
+
+class Mute(models.Model):
+    """Скрытый из лент автор или группа; задано ровно одно из полей."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='mutes',
+        verbose_name='Пользователь'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Группа'
+    )
+    created = models.DateTimeField('Дата', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Скрытие'
+        verbose_name_plural = 'Скрытия'
+        # Уникальные индексы (user, author) и (user, group) обслуживают
+        # анти-джойн лент, см. posts.mutes.
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_mute_author'
+            ),
+            models.UniqueConstraint(
+                fields=('user', 'group'),
+                name='unique_mute_group'
+            ),
+            models.CheckConstraint(
+                check=(
+                    models.Q(author__isnull=False, group__isnull=True)
+                    | models.Q(author__isnull=True, group__isnull=False)
+                ),
+                name='mute_author_or_group'
+            ),
+        )
+
+
+class LastSeen(models.Model):
+    """Когда пользователь последний раз открывал ленты.
+
+    Пишется не чаще раза в ``posts.last_seen.WRITE_INTERVAL``, свежее
+    значение живёт в кэше.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='last_seen',
+        verbose_name='Пользователь'
+    )
+    index = models.DateTimeField('Главная лента')
+    follow = models.DateTimeField('Лента подписок')
+
+    class Meta:
+        verbose_name = 'Последний визит'
+        verbose_name_plural = 'Последние визиты'
+
+
+class StaleRecommendation(models.Model):
+    """Очередь пересчёта: подписки пользователя изменились после
+    последнего расчёта его рекомендаций.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+        verbose_name='Пользователь'
+    )
+    marked = models.DateTimeField('Когда отмечен')
+
+    class Meta:
+        verbose_name = 'Устаревшие рекомендации'
+        verbose_name_plural = 'Устаревшие рекомендации'
+
+
+class Recommendation(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendations',
+        verbose_name='Пользователь'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Рекомендованный автор'
+    )
+    score = models.FloatField('Оценка')
+
+    class Meta:
+        verbose_name = 'Рекомендация'
+        verbose_name_plural = 'Рекомендации'
+        ordering = ('-score',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_recommendation'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-score'),
+                name='recommendation_user_score_idx'
+            ),
+        )
+
+
+class TrendingScore(models.Model):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='Пост'
+    )
+    score = models.FloatField('Оценка', db_index=True)
+
+    class Meta:
+        verbose_name = 'Популярность поста'
+        verbose_name_plural = 'Популярность постов'
+
+
+class StoredFile(models.Model):
+    """Число постов, ссылающихся на файл картинки."""
+    name = models.CharField('Имя файла', max_length=255, unique=True)
+    references = models.PositiveIntegerField('Ссылок', default=0)
+
+    class Meta:
+        verbose_name = 'Файл'
+        verbose_name_plural = 'Файлы'
+
+    def __str__(self):
+        return self.name
+
+
+class MonthlyPostCount(models.Model):
+    """Число постов автора в группе за месяц.
+
+    Поддерживается сигналами при создании, переносе и удалении постов,
+    чтобы навигация по архиву не агрегировала таблицу постов.
+    """
+    month = models.DateField('Месяц')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    group = models.ForeignKey(
+        Group,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Группа'
+    )
+    count = models.PositiveIntegerField('Постов', default=0)
+
+    class Meta:
+        verbose_name = 'Постов за месяц'
+        verbose_name_plural = 'Постов по месяцам'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('month', 'author', 'group'),
+                name='unique_monthly_post_count'
+            ),
+            # NULL в group не совпадает с другим NULL, поэтому строкам без
+            # группы нужен отдельный частичный индекс.
+            models.UniqueConstraint(
+                fields=('month', 'author'),
+                condition=models.Q(group__isnull=True),
+                name='unique_monthly_post_count_no_group'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('group', 'month'),
+                name='monthly_group_month_idx'
+            ),
+            models.Index(
+                fields=('author', 'month'),
+                name='monthly_author_month_idx'
+            ),
+        )
@@ -0,0 +1,109 @@
+"""Скрытие авторов и групп из лент.
+
+Скрытые посты отсекаются в SQL анти-джойном (``NOT EXISTS`` по
+уникальным индексам ``Mute``) до LIMIT, поэтому страницы ленты
+остаются полными, а номера страниц и курсоры — согласованными.
+Множество скрытого хранится в сессии вместе с поколением пользователя:
+у большинства пользователей оно пустое, и тогда лента строится без
+подзапросов, а непустое даёт ключ для кэша фрагментов ленты.
+
+Поколение сдвигается в кэше, поэтому сессии можно доверять только при
+общем кэше (``settings.SHARED_CACHE``). Без него другой процесс не узнал
+бы о новом скрытии, и множество читается из БД один раз за запрос.
+"""
+import hashlib
+from collections import namedtuple
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from .caching import bump_generation, get_generation
+from .models import Mute
+
+SESSION_KEY = 'mutes'
+
+MuteSet = namedtuple('MuteSet', 'authors groups')
+NO_MUTES = MuteSet(frozenset(), frozenset())
+
+
+def generation_name(user_id):
+    return f'mutes:{user_id}'
+
+
+def load_mutes(user):
+    rows = Mute.objects.filter(user=user).values_list('author_id', 'group_id')
+    return {
+        'authors': sorted(author for author, _ in rows if author),
+        'groups': sorted(group for _, group in rows if group),
+    }
+
+
+def get_mutes(request):
+    """Скрытые авторы и группы пользователя из сессии или из БД."""
+    user = request.user
+    if not user.is_authenticated:
+        return NO_MUTES
+    if not settings.SHARED_CACHE:
+        if not hasattr(request, '_mutes'):
+            stored = load_mutes(user)
+            request._mutes = MuteSet(
+                frozenset(stored['authors']), frozenset(stored['groups'])
+            )
+        return request._mutes
+    generation = get_generation(generation_name(user.pk))
+    stored = request.session.get(SESSION_KEY)
+    if stored is None or stored['generation'] != generation:
+        stored = {'generation': generation, **load_mutes(user)}
+        request.session[SESSION_KEY] = stored
+    return MuteSet(frozenset(stored['authors']), frozenset(stored['groups']))
+
+
+def cache_key(mutes):
+    """Часть ключа кэша ленты; пустая, если скрывать нечего."""
+    if mutes == NO_MUTES:
+        return ''
+    raw = '{}|{}'.format(sorted(mutes.authors), sorted(mutes.groups))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def exclude_muted(posts, request):
+    """``posts`` без скрытых пользователем авторов и групп."""
+    user = request.user
+    mutes = get_mutes(request)
+    if mutes.authors:
+        posts = posts.annotate(
+            author_muted=Exists(Mute.objects.filter(
+                user_id=user.pk, author_id=OuterRef('author_id')
+            ))
+        ).filter(author_muted=False)
+    if mutes.groups:
+        posts = posts.annotate(
+            group_muted=Exists(Mute.objects.filter(
+                user_id=user.pk, group_id=OuterRef('group_id')
+            ))
+        ).filter(group_muted=False)
+    return posts
+
+
+def mutes_changed(request):
+    """Сбрасывает сохранённое множество во всех сессиях пользователя."""
+    request.session.pop(SESSION_KEY, None)
+    if hasattr(request, '_mutes'):
+        del request._mutes
+    transaction.on_commit(
+        partial(bump_generation, generation_name(request.user.pk))
+    )
+
+
+def mute(request, author=None, group=None):
+    Mute.objects.get_or_create(user=request.user, author=author, group=group)
+    mutes_changed(request)
+
+
+def unmute(request, author=None, group=None):
+    Mute.objects.filter(
+        user=request.user, author=author, group=group
+    ).delete()
+    mutes_changed(request)
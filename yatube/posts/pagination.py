@@ -0,0 +1,90 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# Наибольшее значение первичного ключа и целочисленных полей (bigint).
+MAX_ID: int = 2 ** 63 - 1
+
+
+class CursorPage:
+    """Страница курсорной пагинации."""
+
+    def __init__(self, object_list, next_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def parse_id(value):
+    """id из параметра запроса или None, если это не целое в
+    диапазоне первичного ключа.
+    """
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if 0 < value <= MAX_ID else None
+
+
+def encode_cursor(*values):
+    raw = json.dumps(values, default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    """Разбирает курсор; для пустого или испорченного возвращает None."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list):
+        return None
+    return values
+
+
+def cursor_paginate(queryset, field, cursor, per_page):
+    """Keyset-пагинация по убыванию (field, id).
+
+    Вместо OFFSET следующая страница начинается строго после последней
+    записи предыдущей, поэтому стоимость запроса не растёт с номером
+    страницы и достаточно индекса по (field, id). Поле field не должно
+    содержать NULL.
+    """
+    model_field = queryset.model._meta.get_field(field)
+    queryset = queryset.order_by(f'-{field}', '-id')
+    position = decode_cursor(cursor)
+    if position is not None and len(position) == 2:
+        try:
+            value = model_field.to_python(position[0])
+        except (ValidationError, TypeError, ValueError):
+            value = None
+        last_id = parse_id(position[1])
+        # Числа вне диапазона bigint база не примет: такой курсор
+        # считаем испорченным и отдаём первую страницу.
+        if isinstance(value, int) and not -MAX_ID - 1 <= value <= MAX_ID:
+            value = None
+        if value is not None and last_id is not None:
+            queryset = queryset.filter(
+                Q(**{f'{field}__lt': value})
+                | Q(**{field: value, 'id__lt': last_id})
+            )
+    object_list = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(object_list) > per_page:
+        object_list = object_list[:per_page]
+        last = object_list[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.id)
+    return CursorPage(object_list, next_cursor)
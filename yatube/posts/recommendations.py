@@ -0,0 +1,236 @@
+"""Рекомендации «на кого подписаться».
+
+Оценка автора для пользователя складывается из двух частей:
+друзья друзей (на автора подписаны те, на кого подписан пользователь)
+и похожие читатели (у пользователя и другого читателя общие подписки,
+и этот читатель подписан на автора).
+
+Полный пересчёт идёт пакетами по графу подписок, загруженному в
+компактные массивы (CSR: смещения + соседи в ``array``), — это около
+8 байт на ребро для прямого и обратного графа вместе. Чтобы время и
+память на одного пользователя были ограничены, от каждой вершины
+берётся не больше ``MAX_FANOUT`` соседей.
+"""
+import heapq
+from array import array
+from collections import Counter
+from operator import itemgetter
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Follow, Recommendation, StaleRecommendation, User
+
+TOP_K: int = 10
+MAX_FANOUT: int = 200
+SIMILAR_USERS: int = 20
+FOF_WEIGHT: float = 1.0
+COFOLLOW_WEIGHT: float = 0.5
+BATCH_SIZE: int = 1000
+# Не больше стольких id в одном IN: SQLite ограничивает число параметров.
+DELETE_CHUNK: int = 500
+CHUNK_SIZE: int = 10000
+NEIGHBOURHOOD_EDGES: int = 10000
+
+
+class FollowGraph:
+    """Граф подписок в формате CSR.
+
+    Соседи вершины ``node`` лежат в ``targets`` между
+    ``offsets[node]`` и ``offsets[node + 1]``.
+    """
+
+    def __init__(self, offsets, targets):
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def load(cls, reverse=False):
+        """Строит граф потоково, не держа в памяти модели Follow.
+
+        При ``reverse=True`` рёбра разворачиваются: автор -> подписчики.
+        """
+        source, target = 'user_id', 'author_id'
+        if reverse:
+            source, target = target, source
+        edges = (
+            Follow.objects.order_by(source, target)
+            .values_list(source, target)
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+        offsets = array('i', [0])
+        targets = array('i')
+        for node, neighbour in edges:
+            while len(offsets) <= node:
+                offsets.append(len(targets))
+            targets.append(neighbour)
+        offsets.append(len(targets))
+        return cls(offsets, targets)
+
+    def nodes(self):
+        """Вершины, у которых есть исходящие рёбра."""
+        offsets = self.offsets
+        return (
+            node for node in range(len(offsets) - 1)
+            if offsets[node] != offsets[node + 1]
+        )
+
+    def neighbours(self, node):
+        if node + 1 >= len(self.offsets):
+            return self.targets[:0]
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+
+class SubGraph:
+    """Окрестность одного пользователя, загруженная из БД.
+
+    Повторяет интерфейс ``FollowGraph``, чтобы пересчёт одного
+    пользователя после изменения его подписок шёл тем же кодом, что и
+    пакетный, но без загрузки всего графа.
+    """
+
+    def __init__(self, edges):
+        self.adjacency = {}
+        for node, neighbour in edges:
+            self.adjacency.setdefault(node, []).append(neighbour)
+
+    def neighbours(self, node):
+        return self.adjacency.get(node, [])
+
+
+def load_neighbourhood(user_id):
+    """Окрестность пользователя, ограниченная на каждом шаге.
+
+    Берутся ``MAX_FANOUT`` подписок, не больше ``NEIGHBOURHOOD_EDGES``
+    рёбер на втором шаге и подписки только ``SIMILAR_USERS`` самых
+    похожих читателей. Подписки передаются в запросы подзапросом, а не
+    списком id, поэтому размер запроса тоже не растёт.
+    """
+    own = Follow.objects.filter(user_id=user_id).order_by('author_id')
+    forward = list(own.values_list('user_id', 'author_id')[:MAX_FANOUT])
+    following = own.values('author_id')[:MAX_FANOUT]
+    forward += (
+        Follow.objects.filter(user_id__in=following).order_by('-id')
+        .values_list('user_id', 'author_id')[:NEIGHBOURHOOD_EDGES]
+    )
+    backward = list(
+        Follow.objects.filter(author_id__in=following)
+        .exclude(user_id=user_id).order_by('-id')
+        .values_list('author_id', 'user_id')[:NEIGHBOURHOOD_EDGES]
+    )
+    similarity = Counter(reader_id for _, reader_id in backward)
+    readers = [
+        reader_id for reader_id, _ in similarity.most_common(SIMILAR_USERS)
+    ]
+    forward += (
+        Follow.objects.filter(user_id__in=readers).order_by('-id')
+        .values_list('user_id', 'author_id')[:SIMILAR_USERS * MAX_FANOUT]
+    )
+    # Читатель может оказаться и автором из подписок: рёбра без повторов
+    # и по возрастанию, как в FollowGraph.
+    return SubGraph(sorted(set(forward))), SubGraph(sorted(backward))
+
+
+def score_user(user_id, forward, backward):
+    """Возвращает до ``TOP_K`` пар (автор, оценка) для пользователя."""
+    following = forward.neighbours(user_id)
+    if not len(following):
+        return []
+    scores = Counter()
+    similarity = Counter()
+    for author_id in following[:MAX_FANOUT]:
+        for candidate_id in forward.neighbours(author_id)[:MAX_FANOUT]:
+            scores[candidate_id] += FOF_WEIGHT
+        for reader_id in backward.neighbours(author_id)[:MAX_FANOUT]:
+            if reader_id != user_id:
+                similarity[reader_id] += 1
+    for reader_id, shared in similarity.most_common(SIMILAR_USERS):
+        weight = COFOLLOW_WEIGHT * shared / len(following)
+        for candidate_id in forward.neighbours(reader_id)[:MAX_FANOUT]:
+            scores[candidate_id] += weight
+    excluded = set(following)
+    excluded.add(user_id)
+    candidates = (
+        item for item in scores.items() if item[0] not in excluded
+    )
+    return heapq.nlargest(TOP_K, candidates, key=itemgetter(1))
+
+
+def save_recommendations(results):
+    """Заменяет списки рекомендаций для пользователей из ``results``."""
+    with transaction.atomic():
+        Recommendation.objects.filter(user_id__in=list(results)).delete()
+        Recommendation.objects.bulk_create(
+            Recommendation(user_id=user_id, author_id=author_id, score=score)
+            for user_id, top in results.items()
+            for author_id, score in top
+        )
+
+
+def build_recommendations(batch_size=BATCH_SIZE):
+    """Полный пакетный пересчёт; возвращает число пользователей."""
+    Recommendation.objects.exclude(
+        user_id__in=Follow.objects.values('user_id')
+    ).delete()
+    forward = FollowGraph.load()
+    backward = FollowGraph.load(reverse=True)
+    processed = 0
+    batch = {}
+    for user_id in forward.nodes():
+        batch[user_id] = score_user(user_id, forward, backward)
+        if len(batch) >= batch_size:
+            save_recommendations(batch)
+            processed += len(batch)
+            batch = {}
+    if batch:
+        save_recommendations(batch)
+        processed += len(batch)
+    return processed
+
+
+def refresh_recommendations(user_id):
+    """Инкрементальный пересчёт одного пользователя."""
+    forward, backward = load_neighbourhood(user_id)
+    save_recommendations({user_id: score_user(user_id, forward, backward)})
+
+
+def mark_stale(user_id):
+    """Ставит пользователя в очередь пересчёта; сам пересчёт идёт вне
+    запроса, командой ``refresh_recommendations``.
+    """
+    if not User.objects.filter(pk=user_id).exists():
+        return
+    StaleRecommendation.objects.update_or_create(
+        user_id=user_id, defaults={'marked': timezone.now()}
+    )
+
+
+def refresh_stale(batch_size=BATCH_SIZE):
+    """Пересчитывает пользователей из очереди; возвращает их число."""
+    processed = 0
+    while True:
+        started = timezone.now()
+        stale = list(
+            StaleRecommendation.objects.order_by('marked')
+            .values_list('user_id', flat=True)[:batch_size]
+        )
+        if not stale:
+            return processed
+        save_recommendations({
+            user_id: score_user(user_id, *load_neighbourhood(user_id))
+            for user_id in stale
+        })
+        # Отмеченные заново во время расчёта остаются в очереди.
+        for start in range(0, len(stale), DELETE_CHUNK):
+            StaleRecommendation.objects.filter(
+                user_id__in=stale[start:start + DELETE_CHUNK],
+                marked__lt=started,
+            ).delete()
+        processed += len(stale)
+
+
+def get_recommendations(user):
+    return (
+        Recommendation.objects.filter(user=user)
+        .select_related('author')[:TOP_K]
+    )
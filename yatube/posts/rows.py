@@ -0,0 +1,101 @@
+"""Лёгкие строки постов для больших выборок (фиды, выгрузки).
+
+Модель ``Post`` с ``select_related`` создаёт на каждую строку три
+экземпляра модели со всеми колонками и служебным состоянием. Здесь
+строка читается одним ``values_list`` и раскладывается в объекты со
+``__slots__``, которые повторяют нужные шаблонам атрибуты:
+``post.author.username``, ``post.group.slug`` и т. п. Авторы и группы
+с одинаковым id разделяются между строками выборки.
+"""
+
+POST_ROW_FIELDS = (
+    'id', 'text', 'pub_date', 'image',
+    'author_id', 'author__username',
+    'author__first_name', 'author__last_name',
+    'group_id', 'group__slug', 'group__title',
+)
+
+
+class AuthorRow:
+    __slots__ = ('id', 'username', 'first_name', 'last_name')
+
+    def __init__(self, id, username, first_name, last_name):
+        self.id = id
+        self.username = username
+        self.first_name = first_name
+        self.last_name = last_name
+
+    @property
+    def pk(self):
+        return self.id
+
+    def get_full_name(self):
+        return f'{self.first_name} {self.last_name}'.strip()
+
+    def __str__(self):
+        return self.username
+
+
+class GroupRow:
+    __slots__ = ('id', 'slug', 'title')
+
+    def __init__(self, id, slug, title):
+        self.id = id
+        self.slug = slug
+        self.title = title
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __str__(self):
+        return self.title
+
+
+class PostRow:
+    __slots__ = ('id', 'text', 'pub_date', 'image', 'author', 'group')
+
+    def __init__(self, id, text, pub_date, image, author, group):
+        self.id = id
+        self.text = text
+        self.pub_date = pub_date
+        self.image = image
+        self.author = author
+        self.group = group
+
+    @property
+    def pk(self):
+        return self.id
+
+    @property
+    def author_id(self):
+        return self.author.id
+
+    @property
+    def group_id(self):
+        return self.group.id if self.group else None
+
+    def __str__(self):
+        return self.text[:15]
+
+
+def post_rows(queryset):
+    """Итератор ``PostRow`` по ``queryset`` постов."""
+    authors = {}
+    groups = {}
+    for (
+        post_id, text, pub_date, image,
+        author_id, username, first_name, last_name,
+        group_id, slug, title,
+    ) in queryset.values_list(*POST_ROW_FIELDS):
+        author = authors.get(author_id)
+        if author is None:
+            author = authors[author_id] = AuthorRow(
+                author_id, username, first_name, last_name
+            )
+        group = None
+        if group_id is not None:
+            group = groups.get(group_id)
+            if group is None:
+                group = groups[group_id] = GroupRow(group_id, slug, title)
+        yield PostRow(post_id, text, pub_date, image, author, group)
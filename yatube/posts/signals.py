@@ -0,0 +1,151 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from . import cards, feeds, media, sitemaps, stats, trending
+from .models import Comment, Follow, Group, Post, User
+from .recommendations import mark_stale
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_values(sender, instance, **kwargs):
+    instance._previous_group_id = None
+    instance._previous_image = ''
+    if instance.pk is not None:
+        previous = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list('group_id', 'image').first()
+        )
+        if previous is not None:
+            instance._previous_group_id, instance._previous_image = previous
+
+
+@receiver(post_save, sender=Post)
+def update_group_stats_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous_group_id = getattr(instance, '_previous_group_id', None)
+    if not created and previous_group_id == instance.group_id:
+        return
+    if previous_group_id is not None:
+        stats.group_post_removed(previous_group_id)
+    if instance.group_id is not None:
+        stats.group_post_added(instance.group_id, instance.pub_date)
+
+
+@receiver(post_save, sender=Post)
+def update_monthly_counts_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous_group_id = getattr(instance, '_previous_group_id', None)
+    if not created and previous_group_id == instance.group_id:
+        return
+    if not created:
+        stats.month_post_removed(
+            instance.author_id, previous_group_id, instance.pub_date
+        )
+    stats.month_post_added(
+        instance.author_id, instance.group_id, instance.pub_date
+    )
+
+
+@receiver(post_save, sender=Post)
+def count_image_references(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous_image = getattr(instance, '_previous_image', '')
+    image = instance.image.name or ''
+    if image == previous_image:
+        return
+    if image:
+        media.acquire(image)
+    if previous_image:
+        media.release(previous_image)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_feeds_and_sitemaps(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    group_ids = {
+        instance.group_id, getattr(instance, '_previous_group_id', None)
+    }
+    slugs = list(
+        Group.objects.filter(pk__in=group_ids).values_list('slug', flat=True)
+    )
+    username = instance.author.username
+    # После фиксации: иначе параллельный запрос закэширует старые данные.
+    transaction.on_commit(partial(feeds.invalidate, slugs, [username]))
+    transaction.on_commit(partial(
+        sitemaps.post_changed,
+        instance.pk,
+        [group_id for group_id in group_ids if group_id is not None],
+        instance.author_id,
+    ))
+
+
+@receiver(pre_delete, sender=Group)
+def move_monthly_counts_of_group(sender, instance, **kwargs):
+    stats.group_deleted(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_sitemap(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(partial(sitemaps.group_changed, instance.pk))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_cards(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(partial(cards.group_changed, instance.pk))
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_cards(sender, instance, raw, update_fields, **kwargs):
+    # Вход пользователя обновляет только last_login: карточки не меняются.
+    if raw or update_fields == frozenset(('last_login',)):
+        return
+    transaction.on_commit(partial(cards.author_changed, instance.pk))
+
+
+@receiver(post_delete, sender=Post)
+def update_group_stats_on_delete(sender, instance, **kwargs):
+    if instance.group_id is not None:
+        stats.group_post_removed(instance.group_id)
+    stats.month_post_removed(
+        instance.author_id, instance.group_id, instance.pub_date
+    )
+    if instance.image:
+        media.release(instance.image.name)
+    trending.discard(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def score_comment(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        trending.record(instance.post_id, 'comment')
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def mark_follower_recommendations_stale(sender, instance, raw=False,
+                                        **kwargs):
+    if raw:
+        return
+    # После коммита: при удалении пользователя его подписки удаляются
+    # каскадом, и ставить его в очередь уже не нужно.
+    transaction.on_commit(partial(mark_stale, instance.user_id))
+
+
+@receiver(post_save, sender=Follow)
+def score_follow(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        trending.record_follow(instance.author_id)
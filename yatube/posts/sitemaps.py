@@ -0,0 +1,144 @@
+"""XML-карты сайта для постов, групп и профилей.
+
+Каждый раздел делится на шарды по диапазонам id по ``SHARD_SIZE``
+записей, поэтому шард читается по индексу первичного ключа без
+смещений. Шард отдаётся потоком и по ходу складывается в кэш; ключ
+включает адрес сайта из запроса и версионируется поколением шарда,
+которое сдвигают сигналы при изменении поста из его диапазона. Без
+общего кэша сдвиг виден только своему процессу, поэтому шард живёт
+в кэше недолго.
+"""
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import Http404
+from django.urls import reverse
+from django.utils.html import escape
+
+from .caching import bump_generation, get_generation, versioned_timeout
+from .models import Group, Post, User
+
+SHARD_SIZE: int = 50000
+SITEMAP_TIMEOUT: int = 60 * 60 * 24
+CHUNK_SIZE: int = 2000
+SHARD_KEY = 'sitemap:{}:{}:{}'
+
+URLSET_START = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+URLSET_END = '</urlset>\n'
+
+
+def shard_of(pk):
+    return (pk - 1) // SHARD_SIZE
+
+
+def shard_range(shard):
+    return shard * SHARD_SIZE + 1, (shard + 1) * SHARD_SIZE
+
+
+def post_rows(shard):
+    rows = (
+        Post.objects.filter(pk__range=shard_range(shard)).order_by('pk')
+        .values_list('pk', 'pub_date').iterator(chunk_size=CHUNK_SIZE)
+    )
+    for pk, pub_date in rows:
+        yield reverse('posts:post_detail', kwargs={'post_id': pk}), pub_date
+
+
+def group_rows(shard):
+    rows = (
+        Group.objects.filter(pk__range=shard_range(shard)).order_by('pk')
+        .values_list('slug', 'last_post_date')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for slug, last_post_date in rows:
+        yield reverse('posts:group_list', kwargs={'slug': slug}), (
+            last_post_date
+        )
+
+
+def profile_rows(shard):
+    # В карту попадают только авторы: пустые профили не нужны поиску.
+    rows = (
+        Post.objects.filter(author__id__range=shard_range(shard))
+        .values('author_id', 'author__username')
+        .annotate(last_post_date=Max('pub_date'))
+        .order_by('author_id')
+        .values_list('author__username', 'last_post_date')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for username, last_post_date in rows:
+        yield reverse('posts:profile', kwargs={'username': username}), (
+            last_post_date
+        )
+
+
+SECTIONS = {
+    'posts': (Post, post_rows),
+    'groups': (Group, group_rows),
+    'profiles': (User, profile_rows),
+}
+
+
+def shard_count(section):
+    model, _ = SECTIONS[section]
+    max_pk = model.objects.aggregate(max_pk=Max('pk'))['max_pk']
+    return shard_of(max_pk) + 1 if max_pk else 0
+
+
+def generation_name(section, shard):
+    return f'sitemap:{section}:{shard}'
+
+
+def render_shard(section, shard, base_url):
+    """Итератор по частям шарда; Http404, если такого шарда нет.
+
+    Границы проверяются только при промахе кэша: шард в кэше уже
+    был существующим.
+    """
+    key = SHARD_KEY.format(base_url, section, shard)
+    version = get_generation(generation_name(section, shard))
+    cached = cache.get(key, version=version)
+    if cached is not None:
+        return iter((cached,))
+    if not 0 <= shard < shard_count(section):
+        raise Http404
+    return build_shard(section, shard, key, version, base_url)
+
+
+def build_shard(section, shard, key, version, base_url):
+    """Отдаёт шард по частям; целиком собранный шард кладёт в кэш."""
+    _, rows = SECTIONS[section]
+    parts = [URLSET_START]
+    yield URLSET_START
+    batch = []
+    for path, lastmod in rows(shard):
+        url = f'<url><loc>{escape(base_url + path)}</loc>'
+        if lastmod:
+            url += f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+        batch.append(url + '</url>\n')
+        if len(batch) >= CHUNK_SIZE:
+            parts.append(''.join(batch))
+            batch = []
+            yield parts[-1]
+    batch.append(URLSET_END)
+    parts.append(''.join(batch))
+    yield parts[-1]
+    # Сюда доходим, только если клиент дочитал шард до конца.
+    cache.set(
+        key, ''.join(parts), versioned_timeout(SITEMAP_TIMEOUT),
+        version=version
+    )
+
+
+def post_changed(post_id, group_ids, author_id):
+    """Сдвигает поколения шардов, в которые входит пост."""
+    bump_generation(generation_name('posts', shard_of(post_id)))
+    bump_generation(generation_name('profiles', shard_of(author_id)))
+    for group_id in group_ids:
+        group_changed(group_id)
+
+
+def group_changed(group_id):
+    bump_generation(generation_name('groups', shard_of(group_id)))
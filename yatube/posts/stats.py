@@ -0,0 +1,132 @@
+from django.db import transaction
+from django.db.models import (
+    Case, Count, F, OuterRef, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from .caching import bump_generation
+from .models import Group, MonthlyPostCount, Post
+
+
+def latest_post_date(group_id):
+    return Subquery(
+        Post.objects.filter(group_id=group_id)
+        .order_by('-pub_date').values('pub_date')[:1]
+    )
+
+
+def group_post_added(group_id, pub_date):
+    """Учитывает новый пост группы одним UPDATE без агрегатов."""
+    Group.objects.filter(pk=group_id).update(
+        posts_count=F('posts_count') + 1,
+        last_post_date=Case(
+            When(last_post_date__gt=pub_date, then=F('last_post_date')),
+            default=Value(pub_date),
+        ),
+    )
+    bump_generation('groups')
+
+
+def group_post_removed(group_id):
+    """Уменьшает счётчик; дату последнего поста берёт по индексу
+    (group, -pub_date) — это одна строка, а не скан постов группы.
+    """
+    Group.objects.filter(pk=group_id, posts_count__gt=0).update(
+        posts_count=F('posts_count') - 1,
+        last_post_date=latest_post_date(group_id),
+    )
+    bump_generation('groups')
+
+
+def rebuild_group_stats():
+    """Полностью пересчитывает статистику всех групп."""
+    posts = Post.objects.filter(group=OuterRef('pk')).order_by()
+    updated = Group.objects.update(
+        posts_count=Coalesce(Subquery(
+            posts.values('group').annotate(total=Count('pk')).values('total')
+        ), 0),
+        last_post_date=Subquery(
+            posts.order_by('-pub_date').values('pub_date')[:1]
+        ),
+    )
+    bump_generation('groups')
+    return updated
+
+
+def month_of(pub_date):
+    return timezone.localtime(pub_date).date().replace(day=1)
+
+
+def add_to_month(month, author_id, group_id, count=1):
+    with transaction.atomic():
+        rollup, created = (
+            MonthlyPostCount.objects.select_for_update().get_or_create(
+                month=month,
+                author_id=author_id,
+                group_id=group_id,
+                defaults={'count': count},
+            )
+        )
+        if not created:
+            MonthlyPostCount.objects.filter(pk=rollup.pk).update(
+                count=F('count') + count
+            )
+
+
+def month_post_added(author_id, group_id, pub_date):
+    """Учитывает пост в помесячной сводке автора и группы."""
+    add_to_month(month_of(pub_date), author_id, group_id)
+
+
+def month_post_removed(author_id, group_id, pub_date):
+    MonthlyPostCount.objects.filter(
+        month=month_of(pub_date),
+        author_id=author_id,
+        group_id=group_id,
+        count__gt=0,
+    ).update(count=F('count') - 1)
+
+
+def group_deleted(group_id):
+    """Посты удалённой группы остаются без группы: переносим их
+    в сводку без группы до каскадного удаления строк группы.
+    """
+    rows = MonthlyPostCount.objects.filter(group_id=group_id, count__gt=0)
+    for month, author_id, count in list(
+        rows.values_list('month', 'author_id', 'count')
+    ):
+        add_to_month(month, author_id, None, count)
+
+
+def rebuild_monthly_counts():
+    """Полностью пересчитывает помесячную сводку по таблице постов."""
+    rows = (
+        Post.objects.order_by()
+        .annotate(month=TruncMonth('pub_date'))
+        .values('month', 'author_id', 'group_id')
+        .annotate(total=Count('pk'))
+    )
+    with transaction.atomic():
+        MonthlyPostCount.objects.all().delete()
+        MonthlyPostCount.objects.bulk_create(
+            MonthlyPostCount(
+                month=month_of(row['month']),
+                author_id=row['author_id'],
+                group_id=row['group_id'],
+                count=row['total'],
+            )
+            for row in rows
+        )
+    return MonthlyPostCount.objects.count()
+
+
+def archive_months(**filters):
+    """Месяцы с постами и их число по сводке, от новых к старым."""
+    return (
+        MonthlyPostCount.objects.filter(**filters)
+        .values('month')
+        .annotate(total=Sum('count'))
+        .filter(total__gt=0)
+        .order_by('-month')
+    )
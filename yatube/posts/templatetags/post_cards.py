@@ -0,0 +1,13 @@
+from django import template
+
+from posts.cards import render_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts):
+    """Карточки постов страницы из кэша одним запросом к нему:
+    ``{% post_cards page_obj as cards %}``.
+    """
+    return render_cards(posts)
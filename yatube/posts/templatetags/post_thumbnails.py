@@ -0,0 +1,10 @@
+from django import template
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def feed_thumbnail(post):
+    return thumbnails.feed_thumbnail(post)
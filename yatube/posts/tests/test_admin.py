@@ -0,0 +1,117 @@
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from http import HTTPStatus
+from unittest import mock
+
+from posts.admin import EstimatedCountPaginator
+from posts.models import Comment, Group, Post, User
+
+
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group
+        )
+        cls.comment = Comment.objects.create(
+            post=cls.post, author=cls.user, text='Комментарий'
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return len(queries)
+
+    def test_changelists_do_not_grow_with_rows(self):
+        """Число запросов changelist не зависит от числа строк"""
+        urls = (
+            reverse('admin:posts_post_changelist'),
+            reverse('admin:posts_comment_changelist'),
+        )
+        for url in urls:
+            self.client.get(url)
+        before = {url: self.changelist_queries(url) for url in urls}
+        for number in range(5):
+            author = User.objects.create_user(username=f'user{number}')
+            group = Group.objects.create(
+                title=f'Группа {number}', slug=f'slug-{number}'
+            )
+            post = Post.objects.create(author=author, text='Пост', group=group)
+            Comment.objects.create(post=post, author=author, text='Текст')
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.changelist_queries(url), before[url])
+
+    def test_comment_search_by_post_id_and_username(self):
+        """Комментарии ищутся по id поста и началу имени автора"""
+        other = Post.objects.create(author=self.admin, text='Другой пост')
+        Comment.objects.create(post=other, author=self.admin, text='Другой')
+        url = reverse('admin:posts_comment_changelist')
+        searches = {
+            str(self.post.id): [self.comment],
+            'Ivan': [self.comment],
+            'Iv': [self.comment],
+            'nobody': [],
+            '²': [],
+            '99999999999999999999': [],
+        }
+        for query, expected in searches.items():
+            with self.subTest(query=query):
+                response = self.client.get(url, {'q': query})
+                self.assertEqual(
+                    list(response.context['cl'].result_list), expected
+                )
+
+    def test_post_change_form_uses_autocomplete(self):
+        """Автор и группа поста выбираются автодополнением"""
+        response = self.client.get(
+            reverse('admin:posts_post_change', args=(self.post.id,))
+        )
+        fields = response.context['adminform'].form.fields
+        for name in ('author', 'group'):
+            with self.subTest(field=name):
+                self.assertIsInstance(
+                    fields[name].widget.widget, AutocompleteSelect
+                )
+
+    def test_post_search_by_username_and_text(self):
+        """Посты ищутся по началу имени автора и тексту всех постов"""
+        newer = Post.objects.create(author=self.admin, text='Новый пост')
+        url = reverse('admin:posts_post_changelist')
+        searches = {
+            'Iv': [self.post],
+            'Новый': [newer],
+            'Тестовый': [self.post],
+        }
+        for query, expected in searches.items():
+            with self.subTest(query=query):
+                response = self.client.get(url, {'q': query})
+                self.assertEqual(
+                    list(response.context['cl'].result_list), expected
+                )
+
+    def test_paginator_counts_past_limit(self):
+        """Без оценки из статистики число строк считается точно"""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {number}')
+            for number in range(5)
+        )
+        with mock.patch('posts.admin.COUNT_LIMIT', 3):
+            paginator = EstimatedCountPaginator(
+                Post.objects.order_by('pk'), 2
+            )
+            self.assertEqual(paginator.count, 6)
+            self.assertEqual(paginator.num_pages, 3)
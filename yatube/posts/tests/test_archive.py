@@ -0,0 +1,140 @@
+from datetime import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, MonthlyPostCount, Post, User
+
+
+def at(year, month, day=15):
+    return timezone.make_aware(datetime(year, month, day))
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.other = User.objects.create_user(username='Petr')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def create(self, pub_date, author=None, group=None, text='Пост'):
+        post = Post.objects.create(
+            author=author or self.user, group=group, text=text
+        )
+        # pub_date заполняется auto_now_add: сдвигаем его в прошлое
+        # и пересчитываем сводку.
+        Post.objects.filter(pk=post.pk).update(pub_date=pub_date)
+        call_command('rebuild_monthly_counts', stdout=StringIO())
+        post.refresh_from_db()
+        return post
+
+    def rollup(self, **filters):
+        return sum(
+            MonthlyPostCount.objects.filter(**filters)
+            .values_list('count', flat=True)
+        )
+
+    def test_signals_maintain_rollup(self):
+        """Сводка следует за созданием, переносом и удалением постов"""
+        post = Post.objects.create(author=self.user, text='Пост')
+        self.assertEqual(self.rollup(author=self.user, group=None), 1)
+        post.group = self.group
+        post.save()
+        self.assertEqual(self.rollup(author=self.user, group=None), 0)
+        self.assertEqual(self.rollup(group=self.group), 1)
+        post.delete()
+        self.assertEqual(self.rollup(), 0)
+
+    def test_rollup_without_group_is_unique(self):
+        """Строка сводки без группы не дублируется"""
+        month = at(2022, 3).date().replace(day=1)
+        MonthlyPostCount.objects.create(month=month, author=self.user)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            MonthlyPostCount.objects.create(month=month, author=self.user)
+        MonthlyPostCount.objects.create(
+            month=month, author=self.user, group=self.group
+        )
+
+    def test_deleted_group_moves_counts(self):
+        """Посты удалённой группы остаются в сводке без группы"""
+        group = Group.objects.create(title='Временная', slug='temp')
+        Post.objects.create(author=self.user, group=group, text='Пост')
+        group.delete()
+        self.assertEqual(self.rollup(author=self.user, group=None), 1)
+
+    def test_rebuild_matches_signals(self):
+        """Пересчёт даёт ту же сводку, что и сигналы"""
+        Post.objects.create(author=self.user, group=self.group, text='1')
+        Post.objects.create(author=self.other, text='2')
+        expected = set(MonthlyPostCount.objects.filter(
+            count__gt=0
+        ).values_list('month', 'author_id', 'group_id', 'count'))
+        call_command('rebuild_monthly_counts', stdout=StringIO())
+        rebuilt = set(MonthlyPostCount.objects.values_list(
+            'month', 'author_id', 'group_id', 'count'
+        ))
+        self.assertEqual(rebuilt, expected)
+
+    def test_archive_navigation_uses_rollup(self):
+        """Навигация по архиву читает только сводку"""
+        self.create(at(2023, 1), group=self.group)
+        self.create(at(2023, 3), author=self.other)
+        cases = (
+            (reverse('posts:archive'), ('/archive/2023/1/', 2)),
+            (
+                reverse('posts:group_archive', args=(self.group.slug,)),
+                ('/group/group/archive/2023/1/', 1),
+            ),
+            (
+                reverse('posts:profile_archive', args=('Petr',)),
+                ('/profile/Petr/archive/2023/3/', 1),
+            ),
+        )
+        for url, (month_url, months) in cases:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertContains(response, month_url)
+                self.assertEqual(len(response.context['months']), months)
+
+    def test_month_lists_its_posts(self):
+        """Страница месяца содержит только посты этого месяца"""
+        january = self.create(at(2023, 1), text='Январский')
+        self.create(at(2023, 2), text='Февральский')
+        response = self.guest_client.get(
+            reverse('posts:archive_month', args=(2023, 1))
+        )
+        self.assertEqual(list(response.context['page_obj']), [january])
+        year = self.guest_client.get(
+            reverse('posts:profile_archive_year', args=('Ivan', 2023))
+        )
+        self.assertEqual(len(year.context['months']), 2)
+
+    def test_invalid_month(self):
+        """Несуществующий месяц отдаёт 404"""
+        response = self.guest_client.get(
+            reverse('posts:archive_month', args=(2023, 13))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_out_of_range_dates(self):
+        """Годы вне диапазона datetime отдают 404, а не 500"""
+        urls = (
+            reverse('posts:archive_month', args=(9999, 12)),
+            reverse('posts:archive_month', args=(10 ** 20, 1)),
+            reverse('posts:archive_year', args=(10 ** 20,)),
+            reverse('posts:archive_year', args=(0,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.guest_client.get(url).status_code, 404
+                )
@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+POSTS: int = 3
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        for number in range(POSTS):
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {number}'
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.url = reverse('posts:profile', kwargs={'username': 'Ivan'})
+        # Сигналы откладывают сброс поколений до фиксации транзакции.
+        patcher = mock.patch(
+            'posts.signals.transaction.on_commit', lambda func: func()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def rendered_cards(self):
+        with mock.patch(
+            'posts.cards.render_to_string', wraps=render_to_string
+        ) as render:
+            response = self.guest_client.get(self.url)
+        return response, render.call_count
+
+    def test_cards_are_cached(self):
+        """Повторный показ страницы не рендерит карточки"""
+        _, first = self.rendered_cards()
+        response, second = self.rendered_cards()
+        self.assertEqual(first, POSTS)
+        self.assertEqual(second, 0)
+        self.assertContains(response, '<article>', count=POSTS)
+
+    def test_only_changed_post_is_rerendered(self):
+        """После правки поста заново рендерится только его карточка"""
+        self.rendered_cards()
+        post = Post.objects.first()
+        post.text = 'Исправленный текст'
+        post.save()
+        response, rendered = self.rendered_cards()
+        self.assertEqual(rendered, 1)
+        self.assertContains(response, 'Исправленный текст')
+
+    def test_group_and_author_changes_invalidate_cards(self):
+        """Смена группы или автора обновляет все их карточки"""
+        self.rendered_cards()
+        self.group.slug = 'renamed'
+        self.group.save()
+        response, rendered = self.rendered_cards()
+        self.assertEqual(rendered, POSTS)
+        self.assertContains(response, '/group/renamed/')
+        self.user.first_name = 'Иван'
+        self.user.save()
+        _, rendered = self.rendered_cards()
+        self.assertEqual(rendered, POSTS)
+
+    def test_login_keeps_cards(self):
+        """Вход автора не сбрасывает его карточки"""
+        self.rendered_cards()
+        self.user.save(update_fields=('last_login',))
+        _, rendered = self.rendered_cards()
+        self.assertEqual(rendered, 0)
+
+    def test_prefetch_failure_falls_back(self):
+        """Сбой предзагрузки миниатюр не роняет ленту"""
+        with mock.patch(
+            'posts.thumbnails.prefetch_thumbnails',
+            side_effect=RuntimeError('KVStore недоступен')
+        ), self.assertLogs('posts.thumbnails', 'ERROR'):
+            response = self.guest_client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Пост 0')
@@ -0,0 +1,200 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import models, threads
+from posts.models import Comment, Post, User
+
+
+class AjaxCommentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.url = reverse(
+            'posts:add_comment', kwargs={'post_id': self.post.pk}
+        )
+
+    def test_ajax_returns_fragment(self):
+        """AJAX-запрос получает HTML только нового комментария"""
+        response = self.authorized_client.post(
+            self.url,
+            {'text': 'Новый комментарий'},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        comment = Comment.objects.get()
+        self.assertEqual(response.status_code, 201)
+        self.assertContains(
+            response, f'id="comment-{comment.pk}"', status_code=201
+        )
+        self.assertContains(response, 'Новый комментарий', status_code=201)
+        self.assertNotContains(response, '<html', status_code=201)
+
+    def test_ajax_json(self):
+        """С Accept: application/json фрагмент приходит в JSON"""
+        response = self.authorized_client.post(
+            self.url,
+            {'text': 'Комментарий в JSON'},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+            HTTP_ACCEPT='application/json',
+        )
+        data = response.json()
+        self.assertEqual(data['id'], Comment.objects.get().pk)
+        self.assertIn('Комментарий в JSON', data['html'])
+
+    def test_ajax_invalid(self):
+        """Пустой комментарий через AJAX — 400 с ошибками формы"""
+        response = self.authorized_client.post(
+            self.url, {'text': ''}, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('text', response.json()['errors'])
+        self.assertFalse(Comment.objects.exists())
+
+    def test_ajax_query_count(self):
+        """AJAX-ответ не перечитывает комментарии поста"""
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.post(
+                self.url,
+                {'text': 'Комментарий'},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+            )
+        selects = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "posts_comment"' in query['sql']
+        ]
+        self.assertEqual(selects, [])
+
+    def test_form_post_still_redirects(self):
+        """Обычная отправка формы по-прежнему редиректит на пост"""
+        response = self.authorized_client.post(self.url, {'text': 'Текст'})
+        self.assertRedirects(
+            response,
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+
+
+class CommentThreadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def comment(self, text, parent=None):
+        return Comment.objects.create(
+            post=self.post, author=self.user, text=text, parent=parent
+        )
+
+    def test_thread_order(self):
+        """Ветка читается обходом в глубину одним запросом"""
+        first = self.comment('1')
+        second = self.comment('2')
+        reply = self.comment('1.1', first)
+        self.comment('1.1.1', reply)
+        self.comment('2.1', second)
+        self.comment('1.2', first)
+        with self.assertNumQueries(1):
+            texts = [comment.text for comment in self.post.comments.all()]
+        self.assertEqual(texts, ['1', '1.1', '1.1.1', '1.2', '2', '2.1'])
+        self.assertEqual(
+            [comment.text for comment in first.subtree()],
+            ['1', '1.1', '1.1.1', '1.2']
+        )
+
+    def test_depth_limit(self):
+        """Ответы глубже предела прикрепляются к последнему уровню"""
+        parent = None
+        for level in range(models.COMMENT_MAX_DEPTH + 2):
+            parent = self.comment(str(level), parent)
+        self.assertEqual(parent.depth, models.COMMENT_MAX_DEPTH)
+        self.assertEqual(parent.parent.depth, models.COMMENT_MAX_DEPTH - 1)
+
+    def test_reply_from_form(self):
+        """Поле parent формы делает комментарий ответом"""
+        root = self.comment('Корень')
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': 'Ответ', 'parent': root.pk},
+        )
+        reply = Comment.objects.get(text='Ответ')
+        self.assertEqual(reply.parent, root)
+        self.assertEqual(reply.depth, 1)
+        self.assertTrue(reply.path.startswith(root.path + '.'))
+
+    def test_reply_to_other_post_ignored(self):
+        """Ответ на комментарий чужого поста становится корнем"""
+        other = Post.objects.create(author=self.user, text='Другой')
+        foreign = Comment.objects.create(
+            post=other, author=self.user, text='Чужой'
+        )
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': 'Ответ', 'parent': foreign.pk},
+        )
+        self.assertIsNone(Comment.objects.get(text='Ответ').parent)
+
+    def test_deep_replies_behind_link(self):
+        """Уровни ниже THREAD_DEPTH открываются отдельной страницей"""
+        parent = None
+        for level in range(threads.THREAD_DEPTH + 1):
+            parent = self.comment(f'Уровень {level}', parent)
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        response = self.guest_client.get(url)
+        self.assertNotContains(response, f'Уровень {threads.THREAD_DEPTH}')
+        boundary = parent.parent
+        thread_url = reverse(
+            'posts:comment_thread',
+            kwargs={'post_id': self.post.pk, 'comment_id': boundary.pk}
+        )
+        self.assertContains(response, thread_url)
+        response = self.guest_client.get(thread_url)
+        self.assertContains(response, f'Уровень {threads.THREAD_DEPTH}')
+
+    def test_load_more(self):
+        """Следующая страница комментариев начинается после пути последнего"""
+        comments = [self.comment(str(number)) for number in range(5)]
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        with mock.patch.object(threads, 'COMMENTS_PER_PAGE', 3):
+            response = self.guest_client.get(url)
+            self.assertContains(response, f'?after={comments[2].path}')
+            response = self.guest_client.get(
+                url, {'after': comments[2].path}
+            )
+        self.assertEqual(
+            [comment.text for comment in response.context['comments']],
+            ['3', '4']
+        )
+        self.assertNotContains(response, 'Загрузить ещё')
+
+    def test_invalid_reply_ids(self):
+        """Некорректный id ответа не приводит к ошибке сервера"""
+        detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )
+        comment_url = reverse(
+            'posts:add_comment', kwargs={'post_id': self.post.pk}
+        )
+        for value in ('²', '99999999999999999999999', '-1', 'abc'):
+            with self.subTest(value=value):
+                response = self.authorized_client.get(
+                    detail_url, {'reply': value}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertIsNone(response.context['reply_to'])
+                self.authorized_client.post(
+                    comment_url, {'text': value, 'parent': value}
+                )
+                self.assertIsNone(Comment.objects.get(text=value).parent)
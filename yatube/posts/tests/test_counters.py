@@ -0,0 +1,91 @@
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts import trending
+from posts.counters import ViewCounter, view_counter
+from posts.models import Post, User
+
+
+class ViewCounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        view_counter.reset()
+        self.post.refresh_from_db()
+
+    def test_views_buffered_until_threshold(self):
+        """Просмотры пишутся в БД только по достижении порога"""
+        counter = ViewCounter(threshold=3, interval=3600)
+        with mock.patch.object(counter, 'flush_async') as flush_async:
+            counter.hit(self.post.id)
+            counter.hit(self.post.id)
+            flush_async.assert_not_called()
+            self.assertEqual(counter.total(self.post), 2)
+            counter.hit(self.post.id)
+            flush_async.assert_called_once_with()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 0)
+        counter.flush()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 3)
+        self.assertEqual(counter.pending(self.post.id), 0)
+
+    def test_flush_feeds_trending(self):
+        """Сброшенные просмотры учитываются в популярном"""
+        counter = ViewCounter(threshold=100, interval=3600)
+        counter.hit(self.post.id)
+        counter.flush()
+        self.assertEqual(
+            [post_id for _, post_id in trending.get_top()], [self.post.id]
+        )
+
+    def test_post_detail_shows_views(self):
+        """Страница поста показывает просмотры с учётом буфера"""
+        client = Client()
+        client.get(reverse('posts:post_detail',
+                           kwargs={'post_id': self.post.id}))
+        response = client.get(reverse('posts:post_detail',
+                                      kwargs={'post_id': self.post.id}))
+        self.assertEqual(response.context['views'], 2)
+
+    def test_flushing_view_keeps_count(self):
+        """Просмотр, запустивший запись, не уменьшает показанный счётчик"""
+        counter = ViewCounter(threshold=2, interval=3600)
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        with mock.patch('posts.views.view_counter', counter), \
+                mock.patch.object(counter, 'flush_async', counter.flush):
+            first = self.client.get(url)
+            second = self.client.get(url)
+        self.assertEqual(first.context['views'], 1)
+        self.assertEqual(second.context['views'], 2)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 2)
+
+
+class BackgroundFlushTests(TransactionTestCase):
+    def test_flush_runs_in_background(self):
+        """Запись буфера выполняется в отдельном потоке"""
+        user = User.objects.create_user(username='Ivan')
+        post = Post.objects.create(author=user, text='Тестовый пост')
+        counter = ViewCounter(threshold=1, interval=3600)
+        threads = []
+        flush_async = counter.flush_async
+        with mock.patch.object(
+            counter, 'flush_async',
+            side_effect=lambda: threads.append(flush_async()),
+        ):
+            counter.hit(post.id)
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0].ident, threading.get_ident())
+        threads[0].join(5)
+        post.refresh_from_db()
+        self.assertEqual(post.views, 1)
@@ -0,0 +1,128 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import caching
+from posts.feeds import FEED_ITEMS, FEED_TIMEOUT
+from posts.models import Group, Post, User
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Первый пост в фиде'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def feed_urls(self):
+        return (
+            reverse('posts:index_rss'),
+            reverse('posts:index_atom'),
+            reverse('posts:group_rss', kwargs={'slug': self.group.slug}),
+            reverse('posts:group_atom', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile_rss', kwargs={'username': 'Ivan'}),
+            reverse('posts:profile_atom', kwargs={'username': 'Ivan'}),
+        )
+
+    def test_feeds_list_posts(self):
+        """Все фиды доступны и содержат пост"""
+        for url in self.feed_urls():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertContains(response, 'Первый пост в фиде')
+
+    def test_unknown_group_and_author(self):
+        """Фид несуществующей группы или автора отдаёт 404"""
+        urls = (
+            reverse('posts:group_rss', kwargs={'slug': 'missing'}),
+            reverse('posts:profile_atom', kwargs={'username': 'missing'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.guest_client.get(url).status_code, 404)
+
+    def test_repeated_poll_is_served_from_cache(self):
+        """Повторный опрос фида не обращается к БД"""
+        url = reverse('posts:index_rss')
+        self.guest_client.get(url)
+        with self.assertNumQueries(0):
+            self.guest_client.get(url)
+
+    @override_settings(ALLOWED_HOSTS=['one.example', 'two.example'])
+    def test_cache_is_per_host(self):
+        """Фид из кэша содержит ссылки на тот сайт, с которого запрошен"""
+        url = reverse('posts:index_rss')
+        self.guest_client.get(url, HTTP_HOST='one.example')
+        response = self.guest_client.get(url, HTTP_HOST='two.example')
+        self.assertContains(response, 'http://two.example/')
+        self.assertNotContains(response, 'one.example')
+
+    def test_conditional_get(self):
+        """Совпавший ETag или Last-Modified даёт 304"""
+        url = reverse('posts:group_atom', kwargs={'slug': self.group.slug})
+        response = self.guest_client.get(url)
+        etag = self.guest_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        modified = self.guest_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(etag.status_code, 304)
+        self.assertEqual(modified.status_code, 304)
+
+    def test_new_post_invalidates_feeds(self):
+        """Новый пост сбрасывает фиды сайта, группы и автора"""
+        for url in self.feed_urls():
+            self.guest_client.get(url)
+        # TestCase не фиксирует транзакцию, поэтому on_commit
+        # выполняем сразу.
+        with mock.patch(
+            'posts.signals.transaction.on_commit', lambda func: func()
+        ):
+            Post.objects.create(
+                author=self.user, group=self.group, text='Свежая запись'
+            )
+        for url in self.feed_urls():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertContains(response, 'Свежая запись')
+
+    def test_non_ascii_username_feed_is_invalidated(self):
+        """Фид автора с кириллическим именем сбрасывается новым постом"""
+        author = User.objects.create_user(username='Иван')
+        Post.objects.create(author=author, text='Старая запись')
+        url = reverse('posts:profile_rss', kwargs={'username': 'Иван'})
+        self.guest_client.get(url)
+        with mock.patch(
+            'posts.signals.transaction.on_commit', lambda func: func()
+        ):
+            Post.objects.create(author=author, text='Свежая запись')
+        self.assertContains(self.guest_client.get(url), 'Свежая запись')
+
+    def test_feed_lives_briefly_without_shared_cache(self):
+        """Без общего кэша фид хранится недолго, с общим — сутки"""
+        url = reverse('posts:index_rss')
+        for shared, timeout in ((False, caching.LOCAL_TIMEOUT),
+                                (True, FEED_TIMEOUT)):
+            with self.subTest(shared=shared), \
+                    override_settings(SHARED_CACHE=shared), \
+                    mock.patch('posts.feeds.cache.set') as cache_set:
+                self.guest_client.get(url)
+                self.assertEqual(cache_set.call_args[0][2], timeout)
+
+    def test_entries_are_capped(self):
+        """Фид содержит не больше FEED_ITEMS записей"""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {number}')
+            for number in range(FEED_ITEMS + 5)
+        )
+        response = self.guest_client.get(reverse('posts:index_rss'))
+        self.assertEqual(response.content.count(b'<item>'), FEED_ITEMS)
@@ -0,0 +1,97 @@
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Follow, User
+
+
+class FollowApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.author = User.objects.create_user(username='Petr')
+        cls.other = User.objects.create_user(username='Olga')
+        cls.fan = User.objects.create_user(username='Fan')
+        Follow.objects.create(user=cls.fan, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.follow_url = reverse(
+            'posts:follow_api', kwargs={'username': 'Petr'}
+        )
+        self.unfollow_url = reverse(
+            'posts:unfollow_api', kwargs={'username': 'Petr'}
+        )
+
+    def test_follow_is_idempotent(self):
+        """Повторная подписка не создаёт второй записи"""
+        for _ in range(2):
+            response = self.authorized_client.post(self.follow_url)
+            self.assertEqual(
+                response.json(), {'following': True, 'followers': 2}
+            )
+        self.assertEqual(
+            Follow.objects.filter(user=self.user, author=self.author).count(),
+            1
+        )
+
+    def test_unfollow_is_idempotent(self):
+        """Повторная отписка отвечает тем же состоянием"""
+        Follow.objects.create(user=self.user, author=self.author)
+        for _ in range(2):
+            response = self.authorized_client.post(self.unfollow_url)
+            self.assertEqual(
+                response.json(), {'following': False, 'followers': 1}
+            )
+
+    def test_self_follow_rejected(self):
+        """Подписаться на себя нельзя"""
+        response = self.authorized_client.post(
+            reverse('posts:follow_api', kwargs={'username': 'Ivan'})
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Follow.objects.filter(user=self.user).exists())
+
+    def test_post_only_and_login_required(self):
+        """GET не меняет подписку, гостю отвечают 401"""
+        self.assertEqual(
+            self.authorized_client.get(self.follow_url).status_code, 405
+        )
+        self.assertEqual(
+            self.guest_client.post(self.follow_url).status_code, 401
+        )
+        self.assertFalse(Follow.objects.filter(user=self.user).exists())
+
+    def test_unknown_author(self):
+        """Подписка на несуществующего автора отдаёт 404"""
+        response = self.authorized_client.post(
+            reverse('posts:follow_api', kwargs={'username': 'missing'})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_follow_state_in_one_query(self):
+        """Состояние подписок на список авторов читается одним запросом"""
+        Follow.objects.create(user=self.user, author=self.author)
+        url = reverse('posts:follow_state') + '?authors=Petr,Olga,missing'
+        with self.assertNumQueries(3):
+            # Сессия, пользователь и сами подписки.
+            response = self.authorized_client.get(url)
+        self.assertEqual(
+            response.json(), {'Petr': True, 'Olga': False, 'missing': False}
+        )
+
+    def test_follow_state_for_guest(self):
+        """Гость ни на кого не подписан"""
+        response = self.guest_client.get(
+            reverse('posts:follow_state') + '?authors=Petr'
+        )
+        self.assertEqual(response.json(), {'Petr': False})
+
+    def test_follow_is_unique(self):
+        """Пара пользователь-автор уникальна на уровне БД"""
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(user=self.fan, author=self.author)
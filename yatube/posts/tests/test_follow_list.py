@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import views
+from posts.models import Follow, User
+from posts.pagination import encode_cursor
+
+
+class FollowListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='Petr')
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.fans = [
+            User.objects.create_user(username=f'fan{number}')
+            for number in range(5)
+        ]
+        for fan in cls.fans:
+            Follow.objects.create(user=fan, author=cls.author)
+        Follow.objects.create(user=cls.user, author=cls.author)
+        Follow.objects.create(user=cls.user, author=cls.fans[0])
+        Follow.objects.create(user=cls.fans[1], author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.followers_url = reverse(
+            'posts:profile_followers', kwargs={'username': 'Petr'}
+        )
+
+    def test_followers_newest_first(self):
+        """Подписчики выводятся от новых к старым"""
+        response = self.guest_client.get(self.followers_url)
+        people = [person.username for person, _, _ in response.context['rows']]
+        self.assertEqual(
+            people, ['Ivan', 'fan4', 'fan3', 'fan2', 'fan1', 'fan0']
+        )
+
+    def test_following(self):
+        """Страница подписок показывает авторов пользователя"""
+        response = self.guest_client.get(
+            reverse('posts:profile_following', kwargs={'username': 'Ivan'})
+        )
+        people = [person.username for person, _, _ in response.context['rows']]
+        self.assertEqual(people, ['fan0', 'Petr'])
+
+    def test_relation_to_viewer(self):
+        """Для зрителя отмечено, на кого он подписан и кто подписан на него"""
+        response = self.authorized_client.get(self.followers_url)
+        rows = {
+            person.username: (following, follows_you)
+            for person, following, follows_you in response.context['rows']
+        }
+        self.assertEqual(rows['fan0'], (True, False))
+        self.assertEqual(rows['fan1'], (False, True))
+        self.assertEqual(rows['fan2'], (False, False))
+        self.assertContains(response, 'Подписан на вас', count=1)
+
+    def test_cursor_pages(self):
+        """Курсор продолжает список без пропусков и повторов"""
+        with mock.patch.object(views, 'NUM_FOLLOWS', 4):
+            first = self.guest_client.get(self.followers_url).context['page']
+            self.assertTrue(first.has_next)
+            second = self.guest_client.get(
+                self.followers_url, {'cursor': first.next_cursor}
+            ).context['page']
+        people = [
+            follow.user.username for follow in list(first) + list(second)
+        ]
+        self.assertEqual(
+            people, ['Ivan', 'fan4', 'fan3', 'fan2', 'fan1', 'fan0']
+        )
+        self.assertFalse(second.has_next)
+
+    def test_out_of_range_cursor(self):
+        """Курсор вне диапазона id даёт первую страницу, а не 500"""
+        first = self.guest_client.get(self.followers_url).context['page']
+        for cursor in (encode_cursor(10 ** 30, 1), encode_cursor(5, 10 ** 30)):
+            with self.subTest(cursor=cursor):
+                response = self.guest_client.get(
+                    self.followers_url, {'cursor': cursor}
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    list(response.context['page']), list(first)
+                )
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        """Число запросов не растёт с числом подписчиков на странице"""
+        with self.assertNumQueries(5):
+            # Автор, страница подписок с пользователями, сессия,
+            # пользователь и связи страницы со зрителем.
+            self.authorized_client.get(self.followers_url)
+
+    def test_unknown_user(self):
+        """Несуществующий пользователь — 404"""
+        response = self.guest_client.get(
+            reverse('posts:profile_followers', kwargs={'username': 'missing'})
+        )
+        self.assertEqual(response.status_code, 404)
@@ -1,3 +1,4 @@
+import hashlib
 import shutil
 import tempfile
 
@@ -90,8 +91,10 @@ class PostFormTests(TestCase):
         self.assertEqual(created_post.author, self.post.author)
         self.assertEqual(created_post.text, form_data['text'])
         self.assertEqual(created_post.group_id, form_data['group'])
+        digest = hashlib.sha256(small_gif).hexdigest()
         self.assertEqual(
-            created_post.image.name, 'posts/' + form_data['image'].name
+            created_post.image.name,
+            f'posts/{digest[:2]}/{digest[2:4]}/{digest}.gif'
         )
 
     def test_guest_create_post(self):
@@ -0,0 +1,130 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from http import HTTPStatus
+
+from posts.models import Group, Post, User
+from posts import views
+from posts.pagination import encode_cursor
+
+
+class GroupStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+        )
+        cls.group_2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test-slug2',
+        )
+
+    def test_stats_follow_post_save_and_delete(self):
+        """Счётчики группы обновляются при создании, переносе и удалении"""
+        first = Post.objects.create(
+            author=self.user, text='Первый', group=self.group
+        )
+        second = Post.objects.create(
+            author=self.user, text='Второй', group=self.group
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 2)
+        self.assertEqual(self.group.last_post_date, second.pub_date)
+
+        second.group = self.group_2
+        second.save()
+        self.group.refresh_from_db()
+        self.group_2.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 1)
+        self.assertEqual(self.group.last_post_date, first.pub_date)
+        self.assertEqual(self.group_2.posts_count, 1)
+
+        first.delete()
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        self.assertIsNone(self.group.last_post_date)
+
+
+class GroupIndexTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.groups = [
+            Group.objects.create(title=f'Группа {i}', slug=f'slug-{i}')
+            for i in range(3)
+        ]
+        for count, group in enumerate(cls.groups):
+            for _ in range(count):
+                Post.objects.create(author=cls.user, text='Пост', group=group)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_group_index_sorted_by_posts_count(self):
+        """Каталог групп сортируется по количеству постов"""
+        response = self.guest_client.get(reverse('posts:group_index'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            list(response.context['page']), self.groups[::-1]
+        )
+
+    def test_group_index_sorted_by_latest_post(self):
+        """Сортировка по свежести пропускает группы без постов"""
+        Post.objects.create(
+            author=self.user, text='Свежий', group=self.groups[1]
+        )
+        response = self.guest_client.get(
+            reverse('posts:group_index') + '?sort=latest'
+        )
+        self.assertEqual(
+            list(response.context['page']),
+            [self.groups[1], self.groups[2]]
+        )
+
+    def test_group_index_cursor_pagination(self):
+        """Курсор ведёт на следующую страницу без пропусков и повторов"""
+        per_page = views.NUM_GROUPS
+        views.NUM_GROUPS = 2
+        try:
+            first = self.guest_client.get(reverse('posts:group_index'))
+            page = first.context['page']
+            self.assertTrue(page.has_next)
+            second = self.guest_client.get(
+                reverse('posts:group_index') + f'?cursor={page.next_cursor}'
+            )
+        finally:
+            views.NUM_GROUPS = per_page
+        self.assertEqual(
+            list(page) + list(second.context['page']), self.groups[::-1]
+        )
+        self.assertFalse(second.context['page'].has_next)
+
+    def test_out_of_range_cursor_serves_first_page(self):
+        """Курсор с числами вне диапазона bigint даёт первую страницу"""
+        first = self.guest_client.get(reverse('posts:group_index'))
+        for cursor in (encode_cursor(10 ** 30, 1), encode_cursor(5, 10 ** 30)):
+            with self.subTest(cursor=cursor):
+                response = self.guest_client.get(
+                    reverse('posts:group_index'), {'cursor': cursor}
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertEqual(
+                    list(response.context['page']),
+                    list(first.context['page'])
+                )
+
+    def test_group_index_invalidated_by_new_post(self):
+        """Новый пост сбрасывает кэш каталога"""
+        self.guest_client.get(reverse('posts:group_index'))
+        for _ in range(3):
+            Post.objects.create(
+                author=self.user, text='Пост', group=self.groups[0]
+            )
+        response = self.guest_client.get(reverse('posts:group_index'))
+        self.assertEqual(response.context['page'].object_list[0],
+                         self.groups[0])
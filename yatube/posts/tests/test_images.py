@@ -0,0 +1,137 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from posts.images import MAX_STORED_SIDE, MAX_UPLOAD_SIDE
+from posts.models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def make_jpeg(width, height, orientation=None):
+    image = Image.new('RGB', (width, height), 'red')
+    options = {}
+    if orientation:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        options['exif'] = exif.tobytes()
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', **options)
+    return SimpleUploadedFile(
+        'photo.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+def make_xpm(width, height):
+    rows = ''.join(f'"{"a" * width}",\n' for _ in range(height))
+    content = (
+        '/* XPM */\nstatic char *image[] = {\n'
+        f'"{width} {height} 1 1",\n"a c #FF0000",\n{rows}}};\n'
+    )
+    return SimpleUploadedFile(
+        'picture.xpm', content.encode(), content_type='image/x-xpixmap'
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageNormalizationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Ivan')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def create(self, image):
+        return self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={'text': 'Картинка', 'image': image},
+        )
+
+    def test_large_photo_is_downscaled_and_stripped(self):
+        """Большое фото уменьшается, теряет EXIF и получает метаданные"""
+        self.create(make_jpeg(MAX_STORED_SIDE * 2, 600, orientation=1))
+        post = Post.objects.get()
+        self.assertEqual(post.image_width, MAX_STORED_SIDE)
+        self.assertEqual(post.image_height, 300)
+        self.assertTrue(
+            post.image_placeholder.startswith('data:image/jpeg;base64,')
+        )
+        with Image.open(post.image.path) as stored:
+            self.assertEqual(stored.size, (MAX_STORED_SIDE, 300))
+            self.assertNotIn('exif', stored.info)
+
+    def test_orientation_is_applied(self):
+        """Поворот из EXIF применяется к пикселям"""
+        self.create(make_jpeg(40, 20, orientation=6))
+        post = Post.objects.get()
+        self.assertEqual((post.image_width, post.image_height), (20, 40))
+
+    def test_small_image_keeps_original_bytes(self):
+        """Маленькая картинка без EXIF сохраняется как есть"""
+        self.create(SimpleUploadedFile(
+            'small.gif', SMALL_GIF, content_type='image/gif'
+        ))
+        post = Post.objects.get()
+        self.assertEqual((post.image_width, post.image_height), (2, 1))
+        with post.image.open() as stored:
+            self.assertEqual(stored.read(), SMALL_GIF)
+
+    def test_read_only_format_is_stored_as_png(self):
+        """Формат, который Pillow не умеет писать, перекодируется в PNG"""
+        response = self.create(make_xpm(MAX_STORED_SIDE + 2, 2))
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get()
+        self.assertTrue(post.image.name.endswith('.png'))
+        self.assertEqual(post.image_width, MAX_STORED_SIDE)
+        with post.image.open() as stored:
+            self.assertEqual(Image.open(stored).format, 'PNG')
+
+    def test_huge_image_is_rejected(self):
+        """Слишком большая картинка отклоняется с ошибкой формы"""
+        response = self.create(make_jpeg(MAX_UPLOAD_SIDE + 1, 8))
+        self.assertFalse(Post.objects.exists())
+        self.assertFormError(
+            response, 'form', 'image',
+            'Картинка слишком большая: %s×8.' % (MAX_UPLOAD_SIDE + 1),
+        )
+
+    def test_feed_reserves_space_with_placeholder(self):
+        """Лента выводит размеры миниатюры и заглушку"""
+        self.create(make_jpeg(40, 20))
+        post = Post.objects.get()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'width="960" height="339"')
+        self.assertContains(response, post.image_placeholder)
+
+    def test_post_detail_image_is_not_lazy(self):
+        """Картинка поста размечается размерами миниатюры без lazy"""
+        self.create(make_jpeg(40, 20))
+        post = Post.objects.get()
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.id})
+        )
+        self.assertContains(response, 'width="960" height="339"')
+        self.assertNotContains(response, 'loading="lazy"')
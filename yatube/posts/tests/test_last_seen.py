@@ -0,0 +1,105 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import last_seen
+from posts.models import Follow, LastSeen, Post, User
+
+
+class NewPostsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.author = User.objects.create_user(username='Petr')
+        cls.stranger = User.objects.create_user(username='Olga')
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = reverse('posts:new_posts')
+
+    def publish(self, author, count=1):
+        for number in range(count):
+            Post.objects.create(author=author, text=f'Пост {number}')
+
+    def test_counts_since_last_visit(self):
+        """Считаются только посты после отметки, отдельно для лент"""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:follow_index'))
+        self.publish(self.author, 2)
+        self.publish(self.stranger, 3)
+        self.assertEqual(
+            self.client.get(self.url).json(), {'index': '5', 'follow': '2'}
+        )
+
+    def test_visit_resets_count(self):
+        """Просмотр первой страницы ленты обнуляет её счётчик"""
+        self.client.get(reverse('posts:index'))
+        self.publish(self.author)
+        self.client.get(self.url)
+        self.client.get(reverse('posts:index'))
+        self.assertEqual(self.client.get(self.url).json()['index'], '')
+
+    def test_marker_stops_at_newest_shown_post(self):
+        """Отметка ставится по самому свежему посту на странице"""
+        seen = timezone.now() - timedelta(hours=1)
+        LastSeen.objects.create(user=self.user, index=seen, follow=seen)
+        self.publish(self.author)
+        shown = Post.objects.get()
+        self.client.get(reverse('posts:index'))
+        self.assertEqual(
+            last_seen.get_markers(self.user)['index'], shown.pub_date
+        )
+        self.publish(self.stranger)
+        self.assertEqual(self.client.get(self.url).json()['index'], '1')
+
+    def test_count_is_bounded(self):
+        """Больше MAX_NEW новых постов показываются как «99+»"""
+        self.client.get(reverse('posts:index'))
+        Post.objects.bulk_create(
+            Post(author=self.author, text='Пост')
+            for _ in range(last_seen.MAX_NEW + 5)
+        )
+        self.assertEqual(self.client.get(self.url).json()['index'], '99+')
+
+    def test_marker_writes_are_coalesced(self):
+        """Отметка пишется в БД не чаще WRITE_INTERVAL"""
+        now = timezone.now() + timedelta(seconds=1)
+        last_seen.mark_seen(self.user, 'index', now, now)
+        soon = now + timedelta(seconds=30)
+        with mock.patch.object(
+            LastSeen.objects, 'update_or_create',
+            side_effect=AssertionError('marker was written')
+        ):
+            last_seen.mark_seen(self.user, 'index', soon, soon)
+        self.assertEqual(last_seen.get_markers(self.user)['index'], soon)
+        later = now + last_seen.WRITE_INTERVAL
+        last_seen.mark_seen(self.user, 'follow', later, later)
+        self.assertEqual(LastSeen.objects.get(user=self.user).follow, later)
+
+    def test_marker_survives_cache_loss(self):
+        """После очистки кэша отметка читается из БД"""
+        seen = timezone.now() - timedelta(hours=1)
+        LastSeen.objects.create(user=self.user, index=seen, follow=seen)
+        self.publish(self.author)
+        self.assertEqual(
+            self.client.get(self.url).json(), {'index': '1', 'follow': '1'}
+        )
+
+    def test_header_badge_uses_cache_only(self):
+        """Шапка показывает счётчики, уже посчитанные эндпоинтом"""
+        self.client.get(reverse('posts:index'))
+        self.publish(self.author)
+        self.client.get(self.url)
+        response = self.client.get(reverse('posts:profile', args=['Olga']))
+        self.assertContains(response, 'data-new-posts="follow">1<')
+
+    def test_guest(self):
+        """Гостю эндпоинт отвечает 401"""
+        self.assertEqual(Client().get(self.url).status_code, 401)
@@ -0,0 +1,138 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import likes
+from posts.models import Like, Post, User
+
+AJAX = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+
+class LikeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.other = User.objects.create_user(username='Petr')
+        cls.post = Post.objects.create(author=cls.other, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.like_url = reverse(
+            'posts:post_like', kwargs={'post_id': self.post.pk}
+        )
+        self.unlike_url = reverse(
+            'posts:post_unlike', kwargs={'post_id': self.post.pk}
+        )
+
+    def likes_count(self):
+        return Post.objects.get(pk=self.post.pk).likes_count
+
+    def test_like_is_idempotent(self):
+        """Повторный лайк не меняет счётчик"""
+        for _ in range(2):
+            response = self.authorized_client.post(self.like_url, **AJAX)
+            self.assertEqual(response.json(), {'liked': True, 'likes': 1})
+        self.assertEqual(Like.objects.count(), 1)
+        self.assertEqual(self.likes_count(), 1)
+
+    def test_unlike_is_idempotent(self):
+        """Повторное снятие лайка не уводит счётчик в минус"""
+        likes.like(self.user, self.post.pk)
+        likes.like(self.other, self.post.pk)
+        for _ in range(2):
+            response = self.authorized_client.post(self.unlike_url, **AJAX)
+            self.assertEqual(response.json(), {'liked': False, 'likes': 1})
+        self.assertEqual(self.likes_count(), 1)
+
+    def test_like_does_not_touch_card_key(self):
+        """Лайк не меняет updated поста и не сбрасывает кэш карточки"""
+        updated = self.post.updated
+        likes.like(self.user, self.post.pk)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).updated, updated)
+
+    def test_form_post_redirects(self):
+        """Обычная форма после лайка возвращает на страницу поста"""
+        response = self.authorized_client.post(self.like_url)
+        self.assertRedirects(
+            response,
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+
+    def test_guest_and_method(self):
+        """Гостю — 401 для AJAX и вход для формы, GET запрещён"""
+        self.assertEqual(
+            self.guest_client.post(self.like_url, **AJAX).status_code, 401
+        )
+        response = self.guest_client.post(self.like_url)
+        detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )
+        self.assertRedirects(
+            response, f'{reverse("users:login")}?next={detail_url}',
+            fetch_redirect_response=False
+        )
+        self.assertEqual(
+            self.authorized_client.get(self.like_url).status_code, 405
+        )
+        self.assertFalse(Like.objects.exists())
+
+    def test_unknown_post(self):
+        """Лайк несуществующего поста — 404"""
+        response = self.authorized_client.post(
+            reverse('posts:post_like', kwargs={'post_id': 0}), **AJAX
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_state_in_one_query(self):
+        """Лайки пользователя для всей страницы читаются одним запросом"""
+        posts = [
+            Post.objects.create(author=self.other, text=f'Пост {number}')
+            for number in range(5)
+        ]
+        likes.like(self.user, posts[1].pk)
+        likes.like(self.user, posts[3].pk)
+        with self.assertNumQueries(1):
+            liked = likes.liked_post_ids(
+                self.user, [post.pk for post in posts]
+            )
+        self.assertEqual(liked, {posts[1].pk, posts[3].pk})
+
+    def test_like_state_endpoint(self):
+        """Эндпоинт состояния отдаёт счётчики и отметки пользователя"""
+        likes.like(self.user, self.post.pk)
+        url = reverse('posts:like_state') + f'?posts={self.post.pk},x,0'
+        response = self.authorized_client.get(url)
+        self.assertEqual(
+            response.json(),
+            {str(self.post.pk): {'likes': 1, 'liked': True}}
+        )
+        response = self.guest_client.get(url)
+        self.assertEqual(
+            response.json(),
+            {str(self.post.pk): {'likes': 1, 'liked': False}}
+        )
+
+    def test_post_detail_shows_state(self):
+        """На странице поста лайк отрисован сервером"""
+        likes.like(self.user, self.post.pk)
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        self.assertTrue(response.context['liked'])
+        self.assertContains(response, 'data-liked="true"')
+
+    def test_like_state_ignores_invalid_ids(self):
+        """Некорректные id в запросе состояния отбрасываются"""
+        url = reverse('posts:like_state')
+        for value in ('²', '99999999999999999999999', '-5'):
+            with self.subTest(value=value):
+                response = self.guest_client.get(
+                    url, {'posts': f'{value},{self.post.pk}'}
+                )
+                self.assertEqual(
+                    response.json(),
+                    {str(self.post.pk): {'likes': 0, 'liked': False}}
+                )
@@ -0,0 +1,173 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import media
+from posts.media import collect_garbage
+from posts.models import Post, StoredFile, User, post_images
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+OTHER_GIF = SMALL_GIF.replace(b'\xFF\xFF\xFF', b'\x00\xFF\x00')
+
+
+def upload(name, content=SMALL_GIF):
+    return SimpleUploadedFile(
+        name=name, content=content, content_type='image/gif'
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ContentAddressedMediaTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Ivan')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        grace = mock.patch.object(media, 'ORPHAN_GRACE', timedelta(0))
+        grace.start()
+        self.addCleanup(grace.stop)
+
+    def references(self, name):
+        return StoredFile.objects.get(name=name).references
+
+    def test_same_image_is_stored_once(self):
+        """Одинаковые картинки хранятся одним файлом со счётчиком ссылок"""
+        first = Post.objects.create(
+            author=self.user, text='Первый', image=upload('a.gif')
+        )
+        second = Post.objects.create(
+            author=self.user, text='Второй', image=upload('b.gif')
+        )
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(
+            first.image.name,
+            r'^posts/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.gif$'
+        )
+        self.assertEqual(self.references(first.image.name), 2)
+
+    def test_post_edit_releases_replaced_image(self):
+        """Замена картинки в post_edit освобождает старый файл"""
+        post = Post.objects.create(
+            author=self.user, text='Пост', image=upload('a.gif')
+        )
+        old_name = post.image.name
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.id}),
+            data={'text': 'Пост', 'image': upload('c.gif', OTHER_GIF)}
+        )
+        post.refresh_from_db()
+        self.assertNotEqual(post.image.name, old_name)
+        self.assertEqual(self.references(old_name), 0)
+        self.assertEqual(collect_garbage(), 1)
+        self.assertFalse(post_images.exists(old_name))
+        self.assertTrue(post_images.exists(post.image.name))
+
+    def test_shared_file_survives_single_delete(self):
+        """Файл удаляется только после удаления последнего поста"""
+        first = Post.objects.create(
+            author=self.user, text='Первый', image=upload('a.gif')
+        )
+        second = Post.objects.create(
+            author=self.user, text='Второй', image=upload('b.gif')
+        )
+        name = first.image.name
+        first.delete()
+        self.assertEqual(collect_garbage(), 0)
+        self.assertTrue(post_images.exists(name))
+        second.delete()
+        self.assertEqual(collect_garbage(), 1)
+        self.assertFalse(post_images.exists(name))
+
+    def test_migrate_media_moves_legacy_files(self):
+        """migrate_media переносит файлы из плоского каталога"""
+        legacy_name = post_images._save(
+            'posts/legacy.gif', ContentFile(SMALL_GIF)
+        )
+        post = Post.objects.create(author=self.user, text='Старый пост')
+        Post.objects.filter(pk=post.pk).update(image=legacy_name)
+        StoredFile.objects.create(name=legacy_name, references=1)
+        call_command('migrate_media', stdout=io.StringIO())
+        post.refresh_from_db()
+        self.assertNotEqual(post.image.name, legacy_name)
+        self.assertTrue(post_images.exists(post.image.name))
+        self.assertFalse(post_images.exists(legacy_name))
+        self.assertEqual(self.references(post.image.name), 1)
+
+    def test_migrate_media_is_idempotent(self):
+        """Повторный запуск migrate_media не трогает перенесённые файлы"""
+        legacy_name = post_images._save(
+            'posts/legacy.gif', ContentFile(SMALL_GIF)
+        )
+        legacy = Post.objects.create(author=self.user, text='Старый пост')
+        Post.objects.filter(pk=legacy.pk).update(image=legacy_name)
+        StoredFile.objects.create(name=legacy_name, references=1)
+        uploaded = Post.objects.create(
+            author=self.user, text='Новый пост',
+            image=upload('c.gif', OTHER_GIF)
+        )
+        out = io.StringIO()
+        call_command('migrate_media', stdout=out)
+        self.assertIn('Перенесено файлов: 1', out.getvalue())
+        legacy.refresh_from_db()
+        migrated_name = legacy.image.name
+        out = io.StringIO()
+        call_command('migrate_media', stdout=out)
+        self.assertIn('Перенесено файлов: 0', out.getvalue())
+        for post, name in ((legacy, migrated_name),
+                           (uploaded, uploaded.image.name)):
+            with self.subTest(name=name):
+                post.refresh_from_db()
+                self.assertEqual(post.image.name, name)
+                self.assertTrue(post_images.is_hashed(name))
+                self.assertTrue(post_images.exists(name))
+
+    def test_recent_orphan_is_kept(self):
+        """Недавно загруженный файл без ссылок переживает сборку мусора"""
+        post = Post.objects.create(
+            author=self.user, text='Пост', image=upload('a.gif')
+        )
+        name = post.image.name
+        path = post_images.path(name)
+        post.delete()
+        with mock.patch.object(media, 'ORPHAN_GRACE', timedelta(hours=1)):
+            self.assertEqual(collect_garbage(), 0)
+            self.assertTrue(post_images.exists(name))
+            # Повторная загрузка того же файла продлевает отсрочку.
+            old = time.time() - 2 * 60 * 60
+            os.utime(path, (old, old))
+            self.assertEqual(
+                post_images.save('posts/b.gif', upload('b.gif')), name
+            )
+            self.assertGreater(os.path.getmtime(path), old)
+            self.assertEqual(collect_garbage(), 0)
+            os.utime(path, (old, old))
+            self.assertEqual(collect_garbage(), 1)
+        self.assertFalse(post_images.exists(name))
@@ -0,0 +1,136 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import views
+from posts.models import Follow, Group, Mute, Post, User
+
+
+@mock.patch('posts.mutes.transaction.on_commit', lambda func: func())
+class MuteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.loud = User.objects.create_user(username='Loud')
+        cls.quiet = User.objects.create_user(username='Quiet')
+        cls.group = Group.objects.create(
+            title='Шумная', slug='noisy', description='Описание'
+        )
+        for number in range(3):
+            Post.objects.create(author=cls.loud, text=f'Громкий {number}')
+            Post.objects.create(
+                author=cls.quiet, group=cls.group, text=f'Группа {number}'
+            )
+            Post.objects.create(author=cls.quiet, text=f'Тихий {number}')
+        Follow.objects.create(user=cls.user, author=cls.loud)
+        Follow.objects.create(user=cls.user, author=cls.quiet)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def texts(self, url, **params):
+        response = self.client.get(url, params)
+        return [post.text for post in response.context['page_obj']]
+
+    def test_mute_author_hides_from_feeds(self):
+        """Скрытый автор пропадает из главной и из подписок"""
+        self.client.post(
+            reverse('posts:profile_mute', kwargs={'username': 'Loud'})
+        )
+        self.assertTrue(
+            Mute.objects.filter(user=self.user, author=self.loud).exists()
+        )
+        for url in (reverse('posts:index'), reverse('posts:follow_index')):
+            with self.subTest(url=url):
+                texts = self.texts(url)
+                self.assertEqual(len(texts), 6)
+                self.assertFalse(any(t.startswith('Громкий') for t in texts))
+
+    def test_mute_group(self):
+        """Скрытая группа пропадает из ленты, посты без группы остаются"""
+        self.client.post(reverse('posts:group_mute', kwargs={'slug': 'noisy'}))
+        texts = self.texts(reverse('posts:index'))
+        self.assertEqual(len(texts), 6)
+        self.assertFalse(any(text.startswith('Группа') for text in texts))
+
+    def test_unmute(self):
+        """Отмена скрытия возвращает посты в ленту"""
+        self.client.post(
+            reverse('posts:profile_mute', kwargs={'username': 'Loud'})
+        )
+        self.client.post(
+            reverse('posts:profile_unmute', kwargs={'username': 'Loud'})
+        )
+        self.assertEqual(len(self.texts(reverse('posts:index'))), 9)
+
+    def test_pages_stay_full(self):
+        """Скрытие идёт в SQL: страницы полные, посты не теряются"""
+        self.client.post(
+            reverse('posts:profile_mute', kwargs={'username': 'Loud'})
+        )
+        with mock.patch.object(views, 'NUM_PUB', 4):
+            first = self.texts(reverse('posts:index'))
+            second = self.texts(reverse('posts:index'), page=2)
+        self.assertEqual((len(first), len(second)), (4, 2))
+        self.assertEqual(len(set(first + second)), 6)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_mute_set_cached_in_session(self):
+        """Без изменений множество скрытого не перечитывается из БД"""
+        self.client.post(
+            reverse('posts:profile_mute', kwargs={'username': 'Loud'})
+        )
+        self.client.get(reverse('posts:index'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('posts:index'))
+        self.assertFalse([
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT "posts_mute"')
+        ])
+
+    @override_settings(SHARED_CACHE=True)
+    def test_other_session_sees_new_mutes(self):
+        """Другая сессия пользователя видит скрытие через поколение"""
+        other_client = Client()
+        other_client.force_login(self.user)
+        other_client.get(reverse('posts:index'))
+        self.client.post(
+            reverse('posts:profile_mute', kwargs={'username': 'Loud'})
+        )
+        response = other_client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 6)
+
+    def test_other_process_sees_new_mutes(self):
+        """Без общего кэша множество скрытого читается из БД"""
+        other_client = Client()
+        other_client.force_login(self.user)
+        other_client.get(reverse('posts:index'))
+        # Поколение другого процесса лежит в его собственном кэше.
+        with mock.patch('posts.mutes.bump_generation'):
+            self.client.post(
+                reverse('posts:profile_mute', kwargs={'username': 'Loud'})
+            )
+        response = other_client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 6)
+
+    def test_cannot_mute_self(self):
+        """Себя скрыть нельзя"""
+        self.client.post(
+            reverse('posts:profile_mute', kwargs={'username': 'Ivan'})
+        )
+        self.assertFalse(Mute.objects.exists())
+
+    def test_guest_feed_has_no_subqueries(self):
+        """Гостю и пользователю без скрытого лента строится без подзапроса"""
+        guest = Client()
+        response = guest.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 9)
+        self.assertNotIn('posts_mute', str(
+            response.context['page_obj'].paginator.object_list.query
+        ))
@@ -0,0 +1,193 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import recommendations
+
+from posts.models import Follow, Recommendation, StaleRecommendation, User
+from posts.recommendations import (
+    build_recommendations, load_neighbourhood, refresh_recommendations
+)
+
+
+class RecommendationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.friend = User.objects.create_user(username='Igor')
+        cls.friend_of_friend = User.objects.create_user(username='Oleg')
+        cls.reader = User.objects.create_user(username='Fedya')
+        cls.reader_author = User.objects.create_user(username='Petr')
+        Follow.objects.bulk_create([
+            Follow(user=cls.user, author=cls.friend),
+            Follow(user=cls.friend, author=cls.friend_of_friend),
+            Follow(user=cls.reader, author=cls.friend),
+            Follow(user=cls.reader, author=cls.reader_author),
+        ])
+
+    def recommended_authors(self, user):
+        return list(
+            Recommendation.objects.filter(user=user)
+            .values_list('author__username', flat=True)
+        )
+
+    def test_build_recommendations(self):
+        """Пакетный пересчёт находит друзей друзей и похожих читателей"""
+        build_recommendations()
+        self.assertEqual(
+            self.recommended_authors(self.user),
+            [self.friend_of_friend.username, self.reader_author.username]
+        )
+
+    def test_followed_author_is_not_recommended(self):
+        """Авторы, на которых уже есть подписка, не рекомендуются"""
+        Follow.objects.create(user=self.user, author=self.friend_of_friend)
+        refresh_recommendations(self.user.id)
+        self.assertEqual(
+            self.recommended_authors(self.user),
+            [self.reader_author.username]
+        )
+
+    def test_incremental_matches_batch(self):
+        """Пересчёт одного пользователя совпадает с пакетным"""
+        build_recommendations()
+        batch = self.recommended_authors(self.user)
+        Recommendation.objects.all().delete()
+        refresh_recommendations(self.user.id)
+        self.assertEqual(self.recommended_authors(self.user), batch)
+
+    def test_recommendations_in_context(self):
+        """Рекомендации выводятся в профиле и в ленте подписок"""
+        build_recommendations()
+        client = Client()
+        client.force_login(self.user)
+        urls = (
+            reverse('posts:profile', kwargs={'username': 'Igor'}),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(
+                    [item.author for item
+                     in response.context['recommendations']],
+                    [self.friend_of_friend, self.reader_author]
+                )
+
+
+@mock.patch('posts.signals.transaction.on_commit', lambda func: func())
+class StaleRecommendationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.friend = User.objects.create_user(username='Igor')
+        cls.friend_of_friend = User.objects.create_user(username='Oleg')
+        Follow.objects.create(user=cls.friend, author=cls.friend_of_friend)
+
+    def test_follow_only_queues_recalculation(self):
+        """Подписка ставит пользователя в очередь, не пересчитывая его"""
+        with mock.patch(
+            'posts.recommendations.load_neighbourhood',
+            side_effect=AssertionError('recalculated in request')
+        ):
+            Follow.objects.create(user=self.user, author=self.friend)
+        self.assertTrue(
+            StaleRecommendation.objects.filter(user=self.user).exists()
+        )
+        self.assertFalse(Recommendation.objects.filter(user=self.user))
+
+    def test_command_drains_queue(self):
+        """Команда пересчитывает очередь и очищает её"""
+        Follow.objects.create(user=self.user, author=self.friend)
+        call_command('refresh_recommendations', stdout=StringIO())
+        self.assertFalse(StaleRecommendation.objects.exists())
+        self.assertEqual(
+            list(Recommendation.objects.filter(user=self.user)
+                 .values_list('author__username', flat=True)),
+            ['Oleg']
+        )
+
+    def test_large_queue_is_drained(self):
+        """Очередь длиннее пачки удаляется без ошибок SQLite"""
+        User.objects.bulk_create(
+            User(username=f'reader{number}')
+            for number in range(recommendations.BATCH_SIZE + 1)
+        )
+        marked = timezone.now() - timedelta(minutes=1)
+        StaleRecommendation.objects.bulk_create(
+            StaleRecommendation(user_id=user_id, marked=marked)
+            for user_id in User.objects.values_list('pk', flat=True)
+        )
+        total = StaleRecommendation.objects.count()
+        self.assertEqual(recommendations.refresh_stale(), total)
+        self.assertFalse(StaleRecommendation.objects.exists())
+
+    def test_marked_during_refresh_is_recalculated(self):
+        """Отмеченный заново во время расчёта пересчитывается ещё раз"""
+        StaleRecommendation.objects.create(
+            user=self.user, marked=timezone.now() - timedelta(minutes=1)
+        )
+        score_user = recommendations.score_user
+        calls = []
+
+        def mark_again(user_id, *args):
+            if not calls:
+                recommendations.mark_stale(user_id)
+            calls.append(user_id)
+            return score_user(user_id, *args)
+
+        with mock.patch.object(recommendations, 'score_user', mark_again):
+            self.assertEqual(recommendations.refresh_stale(), 2)
+        self.assertEqual(calls, [self.user.pk, self.user.pk])
+        self.assertFalse(StaleRecommendation.objects.exists())
+
+    def test_deleting_user_does_not_queue_it(self):
+        """Удаление пользователя с подписками не оставляет очереди"""
+        user = User.objects.create_user(username='Gone')
+        Follow.objects.create(user=user, author=self.friend)
+        StaleRecommendation.objects.all().delete()
+        callbacks = []
+        with mock.patch(
+            'posts.signals.transaction.on_commit', callbacks.append
+        ):
+            user.delete()
+        for callback in callbacks:
+            callback()
+        self.assertFalse(StaleRecommendation.objects.exists())
+
+    def test_neighbourhood_is_bounded(self):
+        """Каждый шаг окрестности ограничен по числу рёбер"""
+        readers = [
+            User.objects.create_user(username=f'reader{number}')
+            for number in range(6)
+        ]
+        Follow.objects.bulk_create(
+            [Follow(user=self.user, author=reader) for reader in readers]
+            + [Follow(user=reader, author=self.friend) for reader in readers]
+            + [
+                Follow(user=reader, author=other)
+                for reader in readers for other in readers
+                if reader != other
+            ]
+        )
+        with mock.patch.multiple(
+            'posts.recommendations',
+            MAX_FANOUT=2, NEIGHBOURHOOD_EDGES=3, SIMILAR_USERS=1
+        ), self.assertNumQueries(4):
+            forward, backward = load_neighbourhood(self.user.pk)
+        forward_edges = sum(
+            len(targets) for targets in forward.adjacency.values()
+        )
+        backward_edges = sum(
+            len(readers) for readers in backward.adjacency.values()
+        )
+        # 2 своих подписки, до 3 рёбер второго шага и до 1 * 2 рёбер
+        # похожего читателя.
+        self.assertLessEqual(forward_edges, 2 + 3 + 2)
+        self.assertLessEqual(backward_edges, 3)
@@ -0,0 +1,56 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import Group, Post, User
+from posts.rows import post_rows
+
+
+class PostRowTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='Ivan', first_name='Иван', last_name='Петров'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Post.objects.create(author=cls.user, group=cls.group, text='Первый')
+        Post.objects.create(author=cls.user, group=cls.group, text='Второй')
+        Post.objects.create(author=cls.user, text='Без группы')
+
+    def test_rows_match_models(self):
+        """Строки повторяют атрибуты моделей, нужные шаблонам"""
+        posts = Post.objects.select_related('author', 'group')
+        with self.assertNumQueries(1):
+            rows = list(post_rows(Post.objects.all()))
+        for post, row in zip(posts, rows):
+            with self.subTest(post=post.pk):
+                self.assertEqual(row.pk, post.pk)
+                self.assertEqual(row.text, post.text)
+                self.assertEqual(row.pub_date, post.pub_date)
+                self.assertEqual(row.author.username, post.author.username)
+                self.assertEqual(
+                    row.author.get_full_name(), post.author.get_full_name()
+                )
+                self.assertEqual(row.group_id, post.group_id)
+                if post.group:
+                    self.assertEqual(row.group.slug, post.group.slug)
+
+    def test_rows_are_compact(self):
+        """Строки без __dict__ и разделяют авторов и группы"""
+        rows = [
+            row for row in post_rows(Post.objects.all())
+            if row.group is not None
+        ]
+        self.assertFalse(hasattr(rows[0], '__dict__'))
+        self.assertIs(rows[0].group, rows[1].group)
+        self.assertIs(rows[0].author, rows[1].author)
+
+    def test_benchmark_command(self):
+        """Замер сравнивает модели и строки"""
+        out = StringIO()
+        call_command('benchmark_rows', rows=10, repeat=1, stdout=out)
+        self.assertIn('PostRow', out.getvalue())
+        self.assertIn('на 1000 строк', out.getvalue())
@@ -0,0 +1,113 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+SHARD_SIZE: int = 2
+
+
+@mock.patch('posts.sitemaps.SHARD_SIZE', SHARD_SIZE)
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {number}'
+            )
+            for number in range(SHARD_SIZE * 2 + 1)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def shard(self, section, shard):
+        response = self.guest_client.get(reverse(
+            'posts:sitemap_section',
+            kwargs={'section': section, 'shard': shard}
+        ))
+        return b''.join(response.streaming_content).decode()
+
+    def shard_of(self, post):
+        return (post.pk - 1) // SHARD_SIZE
+
+    def test_index_lists_shards(self):
+        """Индекс карты перечисляет шарды всех разделов"""
+        response = self.guest_client.get(reverse('posts:sitemap'))
+        last = self.shard_of(self.posts[-1])
+        self.assertContains(response, f'/sitemap-posts-{last}.xml')
+        self.assertNotContains(response, f'/sitemap-posts-{last + 1}.xml')
+        self.assertContains(response, '/sitemap-groups-0.xml')
+        self.assertContains(response, '/sitemap-profiles-0.xml')
+
+    def test_shards_cover_their_id_range(self):
+        """Шард содержит только посты своего диапазона id"""
+        post = self.posts[0]
+        content = self.shard('posts', self.shard_of(post))
+        self.assertEqual(content.count('<url>'), SHARD_SIZE)
+        self.assertIn(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+            content
+        )
+        self.assertIn(
+            f'/group/{self.group.slug}/',
+            self.shard('groups', (self.group.pk - 1) // SHARD_SIZE)
+        )
+        self.assertIn(
+            '/profile/Ivan/',
+            self.shard('profiles', (self.user.pk - 1) // SHARD_SIZE)
+        )
+
+    def test_shard_is_cached_until_its_post_changes(self):
+        """Шард берётся из кэша, пока не изменится пост из него"""
+        post = Post.objects.create(author=self.user, text='Удаляемый')
+        shard = self.shard_of(post)
+        url = reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        self.assertIn(url, self.shard('posts', shard))
+        with self.assertNumQueries(0):
+            self.shard('posts', shard)
+        with mock.patch(
+            'posts.signals.transaction.on_commit', lambda func: func()
+        ):
+            post.delete()
+        self.assertNotIn(url, self.shard('posts', shard))
+
+    def test_unknown_section(self):
+        """Неизвестный раздел карты отдаёт 404"""
+        response = self.guest_client.get(reverse(
+            'posts:sitemap_section', kwargs={'section': 'comments', 'shard': 0}
+        ))
+        self.assertEqual(response.status_code, 404)
+
+    def test_shard_past_the_end(self):
+        """Несуществующий шард раздела отдаёт 404"""
+        last = self.shard_of(self.posts[-1])
+        response = self.guest_client.get(reverse(
+            'posts:sitemap_section',
+            kwargs={'section': 'posts', 'shard': last + 1}
+        ))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(ALLOWED_HOSTS=['one.example', 'two.example'])
+    def test_cache_is_per_host(self):
+        """Шард из кэша содержит адреса того сайта, с которого запрошен"""
+        url = reverse(
+            'posts:sitemap_section', kwargs={'section': 'posts', 'shard': 0}
+        )
+        hosts = ('one.example', 'two.example', 'one.example')
+        contents = [
+            b''.join(self.guest_client.get(
+                url, HTTP_HOST=host
+            ).streaming_content).decode()
+            for host in hosts
+        ]
+        self.assertIn('http://two.example/', contents[1])
+        self.assertNotIn('one.example', contents[1])
+        self.assertEqual(contents[0], contents[2])
@@ -0,0 +1,99 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+POSTS_WITH_IMAGES: int = 3
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailPrefetchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        for number in range(POSTS_WITH_IMAGES):
+            image = SMALL_GIF.replace(
+                b'\xFF\xFF\xFF', bytes((number, 0xFF, 0xFF))
+            )
+            Post.objects.create(
+                author=cls.user,
+                group=cls.group,
+                text=f'Пост {number}',
+                image=SimpleUploadedFile(
+                    f'{number}.gif', image, content_type='image/gif'
+                ),
+            )
+        Post.objects.create(author=cls.user, group=cls.group, text='Текст')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        # KVStore в БД откатывается между тестами, а кэш — нет.
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def kvstore_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.authorized_client.get(url)
+        return response, [
+            query for query in context.captured_queries
+            if 'thumbnail_kvstore' in query['sql']
+        ]
+
+    def test_feeds_read_kvstore_once(self):
+        """Миниатюры страницы читаются из KVStore одним запросом"""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                # Первый показ создаёт миниатюры.
+                self.authorized_client.get(url)
+                cache.clear()
+                response, queries = self.kvstore_queries(url)
+                self.assertEqual(len(queries), 1)
+                self.assertContains(
+                    response, 'class="card-img', count=POSTS_WITH_IMAGES
+                )
+
+    def test_cached_thumbnails_need_no_queries(self):
+        """Миниатюры из кэша не требуют запросов к KVStore"""
+        url = reverse('posts:profile', kwargs={'username': self.user})
+        self.authorized_client.get(url)
+        _, queries = self.kvstore_queries(url)
+        self.assertEqual(queries, [])
+
+    def test_group_page_lists_its_posts(self):
+        """Страница группы выводит посты текущей страницы"""
+        response = self.authorized_client.get(
+            reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        )
+        self.assertContains(response, 'Пост 0')
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import trending
+from posts.models import Comment, Follow, Post, TrendingScore, User
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Ivan')
+        cls.author = User.objects.create_user(username='Igor')
+        cls.quiet_post = Post.objects.create(author=cls.user, text='Тихий')
+        cls.hot_post = Post.objects.create(author=cls.author, text='Горячий')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_decayed_score_prefers_recent_events(self):
+        """Старое событие весит меньше нового с тем же весом"""
+        now = trending.EPOCH + timedelta(days=10)
+        old = trending.event_score(1.0, now - trending.HALF_LIFE)
+        new = trending.event_score(1.0, now)
+        self.assertAlmostEqual(new - old, 1.0)
+        self.assertAlmostEqual(trending.combine(old, old), new)
+
+    def test_comments_and_follows_rank_posts(self):
+        """Комментарии и подписки поднимают пост в популярном"""
+        Comment.objects.create(
+            post=self.quiet_post, author=self.author, text='Комментарий'
+        )
+        Follow.objects.create(user=self.user, author=self.author)
+        self.assertEqual(
+            [post_id for _, post_id in trending.get_top()],
+            [self.hot_post.id, self.quiet_post.id]
+        )
+        self.assertEqual(
+            [post_id for _, post_id in trending.rebuild_top()],
+            [self.hot_post.id, self.quiet_post.id]
+        )
+
+    def test_add_comment_updates_popular_page(self):
+        """Комментарий через add_comment сразу попадает в популярное"""
+        self.authorized_client.post(
+            reverse('posts:add_comment',
+                    kwargs={'post_id': self.quiet_post.id}),
+            data={'text': 'Комментарий'}
+        )
+        response = self.authorized_client.get(reverse('posts:popular'))
+        self.assertEqual(list(response.context['page_obj']),
+                         [self.quiet_post])
+
+    def test_deleted_post_leaves_top(self):
+        """Удалённый пост пропадает из топа"""
+        post = Post.objects.create(author=self.author, text='Удалённый')
+        trending.record(post.id, 'comment')
+        post.delete()
+        self.assertEqual(trending.get_top(), [])
+        self.assertFalse(TrendingScore.objects.exists())
+
+    @mock.patch('posts.trending.transaction.on_commit', lambda func: func())
+    def test_cached_top_is_rebuilt_from_db(self):
+        """Топ в кэше сбрасывается событием и перечитывается из БД"""
+        trending.record(self.quiet_post.id, 'comment')
+        self.assertEqual(
+            [post_id for _, post_id in trending.get_top()],
+            [self.quiet_post.id]
+        )
+        # Устаревший список другого процесса не затирает новые оценки.
+        stale = trending.get_top()
+        trending.record(self.hot_post.id, 'follow')
+        self.assertIsNone(cache.get(trending.TOP_KEY))
+        cache.set(trending.TOP_KEY, stale)
+        trending.record(self.quiet_post.id, 'view')
+        self.assertEqual(
+            [post_id for _, post_id in trending.get_top()],
+            [self.hot_post.id, self.quiet_post.id]
+        )
+
+    @mock.patch('posts.trending.TOP_N', 1)
+    @mock.patch('posts.trending.transaction.on_commit', lambda func: func())
+    def test_event_below_top_keeps_cache(self):
+        """Событие поста, не попадающего в топ, не сбрасывает кэш"""
+        trending.record(self.hot_post.id, 'follow')
+        top = trending.get_top()
+        trending.record(self.quiet_post.id, 'view')
+        self.assertEqual(cache.get(trending.TOP_KEY), top)
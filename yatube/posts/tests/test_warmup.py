@@ -0,0 +1,65 @@
+import os
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TransactionTestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.warmup import fetch, warmup_key, warmup_urls
+
+
+class WarmupTests(TransactionTestCase):
+    # Страницы запрашиваются из потоков пула со своими соединениями,
+    # поэтому данные должны быть зафиксированы.
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='Ivan')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Post.objects.create(author=self.user, group=self.group, text='Пост')
+
+    def test_urls_cover_index_groups_and_profiles(self):
+        """Прогреваются первые страницы ленты, группы и профили"""
+        urls = warmup_urls(pages=2)
+        self.assertEqual(urls, [
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_list', kwargs={'slug': 'group'}),
+            reverse('posts:profile', kwargs={'username': 'Ivan'}),
+        ])
+
+    def test_command_fills_fragment_cache(self):
+        """После команды лента отдаётся из кэша фрагментов"""
+        out = StringIO()
+        call_command('warm_cache', pages=1, workers=2, stdout=out)
+        self.assertIn('ошибок: 0', out.getvalue())
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = Client().get(reverse('posts:index'))
+        self.assertNotContains(response, 'Новый пост')
+
+    def test_fetch_calls_view_directly(self):
+        """Страницы рендерятся вызовом view без тестового клиента"""
+        self.assertEqual(fetch(reverse('posts:index')), 200)
+        self.assertEqual(
+            fetch(reverse('posts:group_list', kwargs={'slug': 'missing'})),
+            404
+        )
+
+    def test_readiness(self):
+        """Эндпоинт готовности отвечает 503, пока идёт прогрев"""
+        client = Client()
+        self.assertEqual(client.get(reverse('posts:ready')).status_code, 200)
+        cache.set(warmup_key(), True)
+        response = client.get(reverse('posts:ready'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {'ready': False})
+
+    def test_warmup_flag_is_per_process(self):
+        """Флаг прогрева другого процесса не влияет на готовность"""
+        cache.set(f'warmup:running:{os.getpid() + 1}', True)
+        response = Client().get(reverse('posts:ready'))
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,34 @@
+"""Ветки комментариев поверх материализованного пути.
+
+Страница ветки — один запрос по индексу (post, path): комментарии
+идут обходом в глубину, следующая страница начинается после пути
+последнего показанного комментария. На странице показывается
+``THREAD_DEPTH`` уровней от корня; у комментариев на последнем уровне
+отмечено, есть ли у них скрытые ответы.
+"""
+from django.db.models import Exists, OuterRef
+
+from .models import Comment
+
+THREAD_DEPTH: int = 3
+COMMENTS_PER_PAGE: int = 50
+
+
+def thread_page(comments, root_depth=0, after=None):
+    """Срез ``comments`` для одной страницы ветки (ленивый QuerySet)."""
+    comments = comments.filter(
+        depth__lt=root_depth + THREAD_DEPTH
+    ).select_related('author').annotate(
+        has_replies=Exists(Comment.objects.filter(parent=OuterRef('pk')))
+    ).order_by('path')
+    if after:
+        comments = comments.filter(path__gt=after)
+    return comments[:COMMENTS_PER_PAGE]
+
+
+def thread_context(comments, root_depth=0):
+    return {
+        'comments': comments,
+        'last_depth': root_depth + THREAD_DEPTH - 1,
+        'per_page': COMMENTS_PER_PAGE,
+    }
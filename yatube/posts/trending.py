@@ -0,0 +1,121 @@
+"""Популярные посты с затухающей оценкой.
+
+Каждое событие (комментарий, подписка на автора, просмотр) добавляет
+к оценке поста свой вес, который затухает вдвое за ``HALF_LIFE``.
+Чтобы не пересчитывать все оценки с течением времени, они хранятся в
+логарифмической шкале относительно фиксированной эпохи:
+
+    score = log2(sum(weight * 2 ** ((event_time - EPOCH) / HALF_LIFE)))
+
+Порядок по такой оценке в любой момент совпадает с порядком по
+затухшим весам, поэтому событие меняет ровно одну строку, а топ читается
+из БД по индексу на score. В кэше лежит только готовый результат этого
+запроса: событие, способное изменить топ, удаляет ключ после коммита, и
+следующий читатель перестраивает топ из БД. Правки списка на месте нет,
+поэтому параллельные события не затирают друг друга. Без общего кэша
+удаление видно только своему процессу, и остальные отстают не дольше
+``TOP_TIMEOUT``.
+"""
+import math
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Post, TrendingScore
+
+EPOCH = datetime(2022, 1, 1, tzinfo=timezone.utc)
+HALF_LIFE = timedelta(hours=24)
+# Оценки старше этого числа полураспадов уже не влияют на топ.
+STALE_HALF_LIVES: int = 30
+WEIGHTS = {
+    'comment': 3.0,
+    'follow': 5.0,
+    'view': 0.1,
+}
+TOP_N: int = 100
+TOP_KEY = 'trending:top'
+TOP_TIMEOUT: int = 60
+
+
+def event_score(weight, when=None):
+    when = when or timezone.now()
+    return math.log2(weight) + (when - EPOCH) / HALF_LIFE
+
+
+def combine(first, second):
+    """Сумма весов в логарифмической шкале без переполнения."""
+    high, low = max(first, second), min(first, second)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def rebuild_top():
+    """Перечитывает топ из БД по индексу на score."""
+    top = list(
+        TrendingScore.objects.order_by('-score')
+        .values_list('score', 'post_id')[:TOP_N]
+    )
+    cache.set(TOP_KEY, top, TOP_TIMEOUT)
+    return top
+
+
+def get_top():
+    """Список (score, post_id) по убыванию оценки."""
+    top = cache.get(TOP_KEY)
+    if top is None:
+        top = rebuild_top()
+    return top
+
+
+def _invalidate_top(post_id, score=None):
+    """Сбрасывает топ, если пост в нём есть или может в него попасть."""
+    top = cache.get(TOP_KEY)
+    if top is None:
+        return
+    if any(item[1] == post_id for item in top) or (
+        score is not None and (len(top) < TOP_N or score > top[-1][0])
+    ):
+        cache.delete(TOP_KEY)
+
+
+def record(post_id, event, count=1, when=None):
+    """Учитывает ``count`` событий ``event`` для поста."""
+    delta = event_score(WEIGHTS[event] * count, when)
+    with transaction.atomic():
+        trending, created = (
+            TrendingScore.objects.select_for_update()
+            .get_or_create(post_id=post_id, defaults={'score': delta})
+        )
+        if not created:
+            trending.score = combine(trending.score, delta)
+            trending.save(update_fields=('score',))
+    # После коммита: иначе читатель успеет перестроить топ без этой оценки.
+    transaction.on_commit(lambda: _invalidate_top(post_id, trending.score))
+
+
+def discard(post_id):
+    transaction.on_commit(lambda: _invalidate_top(post_id))
+
+
+def record_follow(author_id):
+    """Подписку засчитываем последнему посту автора."""
+    post_id = (
+        Post.objects.filter(author_id=author_id)
+        .values_list('id', flat=True).first()
+    )
+    if post_id is not None:
+        record(post_id, 'follow')
+
+
+def prune_stale():
+    """Удаляет оценки, которые уже не могут попасть в топ."""
+    threshold = event_score(1.0) - STALE_HALF_LIVES
+    deleted, _ = TrendingScore.objects.filter(score__lt=threshold).delete()
+    return deleted
+
+
+def ranked_posts(post_ids):
+    """Посты в порядке ``post_ids`` одним запросом."""
+    posts = Post.objects.select_related('author', 'group').in_bulk(post_ids)
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
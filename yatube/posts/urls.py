@@ -1,19 +1,88 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('rss/', feeds.site_rss, name='index_rss'),
+    path('atom/', feeds.site_atom, name='index_atom'),
+    path('popular/', views.popular, name='popular'),
+    path('groups/', views.group_index, name='group_index'),
+    path('archive/', views.archive, name='archive'),
+    path('archive/<int:year>/', views.archive, name='archive_year'),
+    path(
+        'archive/<int:year>/<int:month>/',
+        views.archive,
+        name='archive_month'
+    ),
+    path(
+        'group/<slug:slug>/archive/',
+        views.group_archive,
+        name='group_archive'
+    ),
+    path(
+        'group/<slug:slug>/archive/<int:year>/',
+        views.group_archive,
+        name='group_archive_year'
+    ),
+    path(
+        'group/<slug:slug>/archive/<int:year>/<int:month>/',
+        views.group_archive,
+        name='group_archive_month'
+    ),
+    path(
+        'profile/<str:username>/archive/',
+        views.profile_archive,
+        name='profile_archive'
+    ),
+    path(
+        'profile/<str:username>/archive/<int:year>/',
+        views.profile_archive,
+        name='profile_archive_year'
+    ),
+    path(
+        'profile/<str:username>/archive/<int:year>/<int:month>/',
+        views.profile_archive,
+        name='profile_archive_month'
+    ),
+    path('ready/', views.ready, name='ready'),
+    path('sitemap.xml', views.sitemap_index, name='sitemap'),
+    path(
+        'sitemap-<slug:section>-<int:shard>.xml',
+        views.sitemap_section,
+        name='sitemap_section'
+    ),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('group/<slug:slug>/rss/', feeds.group_rss, name='group_rss'),
+    path('group/<slug:slug>/atom/', feeds.group_atom, name='group_atom'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/rss/', feeds.profile_rss, name='profile_rss'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.profile_atom,
+        name='profile_atom'
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('create/', views.post_create, name='post_create'),
     path(
         'posts/<int:post_id>/comment/', views.add_comment, name='add_comment'
     ),
+    path('posts/<int:post_id>/like/', views.post_like, name='post_like'),
+    path(
+        'posts/<int:post_id>/unlike/', views.post_unlike, name='post_unlike'
+    ),
+    path('api/likes/', views.like_state, name='like_state'),
+    path('api/new-posts/', views.new_posts, name='new_posts'),
+    path(
+        'posts/<int:post_id>/comments/<int:comment_id>/',
+        views.comment_thread,
+        name='comment_thread'
+    ),
     path('follow/', views.follow_index, name='follow_index'),
     path(
         'profile/<str:username>/follow/',
@@ -25,4 +94,39 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path(
+        'profile/<str:username>/followers/',
+        views.profile_followers,
+        name='profile_followers'
+    ),
+    path(
+        'profile/<str:username>/following/',
+        views.profile_following,
+        name='profile_following'
+    ),
+    path(
+        'profile/<str:username>/mute/',
+        views.profile_mute,
+        name='profile_mute'
+    ),
+    path(
+        'profile/<str:username>/unmute/',
+        views.profile_unmute,
+        name='profile_unmute'
+    ),
+    path('group/<slug:slug>/mute/', views.group_mute, name='group_mute'),
+    path(
+        'group/<slug:slug>/unmute/', views.group_unmute, name='group_unmute'
+    ),
+    path(
+        'api/profile/<str:username>/follow/',
+        views.follow_api,
+        name='follow_api'
+    ),
+    path(
+        'api/profile/<str:username>/unfollow/',
+        views.unfollow_api,
+        name='unfollow_api'
+    ),
+    path('api/follow-state/', views.follow_state, name='follow_state'),
 ]
@@ -1,12 +1,46 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from datetime import datetime
+
+from django.conf import settings
+from django.shortcuts import (
+    render, get_object_or_404, redirect, resolve_url
+)
+from django.http import (
+    Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+)
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import timezone
+from django.core.cache import cache
 from django.core.paginator import Paginator
+from django.db.models import Q
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
+from django.views.decorators.http import require_GET, require_POST
 
-
+from . import last_seen, likes, mutes
+from .caching import get_generation
+from .counters import view_counter
 from .forms import PostForm, CommentForm
-from .models import Post, Group, User, Follow
+from .models import Comment, Post, Group, User, Follow
+from .pagination import cursor_paginate, decode_cursor, parse_id
+from .recommendations import get_recommendations
+from .sitemaps import SECTIONS, render_shard, shard_count
+from .stats import archive_months
+from .threads import thread_context, thread_page
+from .trending import get_top, ranked_posts
+from .warmup import is_ready
 
 NUM_PUB: int = 10
+NUM_GROUPS: int = 30
+GROUP_INDEX_TIMEOUT: int = 60 * 5
+NUM_FOLLOW_STATE: int = 100
+NUM_LIKE_STATE: int = 100
+# Наибольшее значение первичного ключа (знаковое 64-битное целое).
+NUM_FOLLOWS: int = 50
+GROUP_SORTS = {
+    'posts': 'posts_count',
+    'latest': 'last_post_date',
+}
 
 
 def paginator(request, lists):
@@ -15,15 +49,38 @@ def paginator(request, lists):
     return paginator.get_page(page_number)
 
 
+def mark_feed_seen(request, page_obj, feed):
+    # Новые посты появляются на первой странице: только её просмотр
+    # сдвигает отметку, и только до самого свежего поста на ней —
+    # пост, вышедший после выборки, ещё не показан.
+    if request.user.is_authenticated and page_obj.number == 1:
+        seen = page_obj[0].pub_date if page_obj else timezone.now()
+        last_seen.mark_seen(request.user, feed, seen)
+
+
 def index(request):
-    post_list = Post.objects.all()
+    post_list = mutes.exclude_muted(Post.objects.all(), request)
     page_obj = paginator(request, post_list)
+    mark_feed_seen(request, page_obj, 'index')
     context = {
         'page_obj': page_obj,
+        'mute_key': mutes.cache_key(mutes.get_mutes(request)),
     }
     return render(request, 'posts/index.html', context)
 
 
+def popular(request):
+    # Топ уже отсортирован и лежит в кэше: страница стоит одного
+    # запроса на NUM_PUB постов.
+    post_ids = [post_id for _, post_id in get_top()]
+    page_obj = paginator(request, post_ids)
+    page_obj.object_list = ranked_posts(page_obj.object_list)
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/popular.html', context)
+
+
 def group_posts(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
@@ -32,38 +89,98 @@ def group_posts(request, slug):
     context = {
         'group': group,
         'page_obj': page_obj,
+        'muted': group.pk in mutes.get_mutes(request).groups,
     }
     return render(request, template, context)
 
 
+def group_index(request):
+    sort = request.GET.get('sort')
+    if sort not in GROUP_SORTS:
+        sort = 'posts'
+    cursor = request.GET.get('cursor', '')
+    if decode_cursor(cursor) is None:
+        cursor = ''
+    key = f'group_index:{sort}:{cursor}'
+    version = get_generation('groups')
+    page = cache.get(key, version=version)
+    if page is None:
+        groups = Group.objects.all()
+        if sort == 'latest':
+            # Группы без постов не участвуют в сортировке по свежести.
+            groups = groups.filter(last_post_date__isnull=False)
+        page = cursor_paginate(groups, GROUP_SORTS[sort], cursor, NUM_GROUPS)
+        cache.set(key, page, GROUP_INDEX_TIMEOUT, version=version)
+    context = {
+        'page': page,
+        'sort': sort,
+        'cursor': cursor,
+    }
+    return render(request, 'posts/group_index.html', context)
+
+
 def profile(request, username):
     author = get_object_or_404(User, username=username)
     user_posts = author.posts.all()
     page_obj = paginator(request, user_posts)
     following = False
+    recommendations = ()
     if request.user.is_authenticated:
         following = Follow.objects.filter(
             user=request.user, author=author
         ).exists()
+        recommendations = get_recommendations(request.user)
     context = {
+        'muted': author.pk in mutes.get_mutes(request).authors,
         'author': author,
         'page_obj': page_obj,
         'following': following,
+        'recommendations': recommendations,
     }
     return render(request, 'posts/profile.html', context)
 
 
 def post_detail(request, post_id):
     post = get_object_or_404(Post, id=post_id)
-    comments = post.comments.all()
+    views = view_counter.total(post) + 1
+    view_counter.hit(post.id)
+    comments = thread_page(
+        post.comments.all(), after=request.GET.get('after')
+    )
     context = {
         'post': post,
-        'comments': comments,
-        'form': CommentForm()
+        'views': views,
+        'form': CommentForm(),
+        'reply_to': reply_target(post, request.GET.get('reply')),
+        'liked': post.pk in likes.liked_post_ids(request.user, [post.pk]),
+        **thread_context(comments),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def comment_thread(request, post_id, comment_id):
+    """Поддерево комментария: ответы, не поместившиеся на странице поста."""
+    root = get_object_or_404(
+        Comment.objects.select_related('post'), pk=comment_id, post_id=post_id
+    )
+    comments = thread_page(
+        root.subtree(), root.depth, after=request.GET.get('after')
+    )
+    context = {
+        'post': root.post,
+        'root': root,
+        **thread_context(comments, root.depth),
+    }
+    return render(request, 'posts/comment_thread.html', context)
+
+
+def reply_target(post, comment_id):
+    comment_id = parse_id(comment_id)
+    if comment_id is None:
+        return None
+    return post.comments.filter(pk=comment_id).first()
+
+
 @login_required
 def post_create(request):
     form = PostForm(
@@ -106,16 +223,39 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
+        comment.parent = reply_target(post, request.POST.get('parent'))
         comment.save()
+        if request.is_ajax():
+            return comment_response(request, comment)
+    elif request.is_ajax():
+        return JsonResponse(
+            {'errors': form.errors.get_json_data()}, status=400
+        )
     return redirect('posts:post_detail', post_id=post_id)
 
 
+def comment_response(request, comment):
+    """Ответ на AJAX-комментарий: HTML только нового комментария,
+    обёрнутый в JSON, если клиент просит ``application/json``.
+    """
+    html = render_to_string(
+        'posts/includes/comment.html', {'comment': comment}, request
+    )
+    if 'application/json' in request.META.get('HTTP_ACCEPT', ''):
+        return JsonResponse({'id': comment.pk, 'html': html}, status=201)
+    return HttpResponse(html, status=201)
+
+
 @login_required
 def follow_index(request):
-    list_of_posts = Post.objects.filter(author__following__user=request.user)
+    list_of_posts = mutes.exclude_muted(
+        Post.objects.filter(author__following__user=request.user), request
+    )
     page_obj = paginator(request, list_of_posts)
+    mark_feed_seen(request, page_obj, 'follow')
     context = {
-        'page_obj': page_obj
+        'page_obj': page_obj,
+        'recommendations': get_recommendations(request.user),
     }
     return render(request, 'posts/follow.html', context)
 
@@ -136,3 +276,293 @@ def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     Follow.objects.filter(user=request.user, author=author).delete()
     return redirect('posts:profile', username)
+
+
+def follow_response(request, username, follow):
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Требуется авторизация'}, status=401)
+    author = get_object_or_404(User, username=username)
+    if request.user == author:
+        return JsonResponse(
+            {'error': 'Нельзя подписаться на себя'}, status=400
+        )
+    if follow:
+        # При уникальном индексе get_or_create безопасен и в гонке, а
+        # сигналы рекомендаций срабатывают только на новую подписку.
+        Follow.objects.get_or_create(user=request.user, author=author)
+    else:
+        Follow.objects.filter(user=request.user, author=author).delete()
+    return JsonResponse({
+        'following': follow,
+        'followers': Follow.objects.filter(author=author).count(),
+    })
+
+
+def follow_list(request, username, relation):
+    """Подписчики автора (``relation='user'``) или его подписки
+    (``relation='author'``) курсорными страницами по id подписки.
+    """
+    author = get_object_or_404(User, username=username)
+    if relation == 'user':
+        follows = Follow.objects.filter(author=author)
+    else:
+        follows = Follow.objects.filter(user=author)
+    follows = follows.select_related(relation).only(
+        'id',
+        f'{relation}__username',
+        f'{relation}__first_name',
+        f'{relation}__last_name',
+    )
+    cursor = request.GET.get('cursor', '')
+    if decode_cursor(cursor) is None:
+        cursor = ''
+    page = cursor_paginate(follows, 'id', cursor, NUM_FOLLOWS)
+    people = [getattr(follow, relation) for follow in page]
+    following = follows_you = set()
+    viewer = request.user
+    if viewer.is_authenticated and people:
+        # Обе стороны связи со зрителем для всей страницы одним запросом.
+        ids = [person.id for person in people]
+        edges = list(Follow.objects.filter(
+            Q(user=viewer, author__in=ids) | Q(user__in=ids, author=viewer)
+        ).values_list('user_id', 'author_id'))
+        following = {
+            author_id for user_id, author_id in edges if user_id == viewer.id
+        }
+        follows_you = {
+            user_id for user_id, author_id in edges if author_id == viewer.id
+        }
+    context = {
+        'author': author,
+        'relation': relation,
+        'page': page,
+        'cursor': cursor,
+        'rows': [
+            (person, person.id in following, person.id in follows_you)
+            for person in people
+        ],
+    }
+    return render(request, 'posts/follow_list.html', context)
+
+
+def profile_followers(request, username):
+    return follow_list(request, username, 'user')
+
+
+def profile_following(request, username):
+    return follow_list(request, username, 'author')
+
+
+def like_response(request, post_id, action):
+    if not request.user.is_authenticated:
+        if request.is_ajax():
+            return JsonResponse({
+                'error': 'Требуется авторизация',
+                'login': resolve_url(settings.LOGIN_URL),
+            }, status=401)
+        # После входа возвращаем на страницу поста: сам адрес лайка
+        # принимает только POST.
+        return redirect_to_login(
+            reverse('posts:post_detail', kwargs={'post_id': post_id})
+        )
+    post = get_object_or_404(Post.objects.only('id'), pk=post_id)
+    likes_count = action(request.user, post.pk)
+    if request.is_ajax():
+        return JsonResponse({
+            'liked': action is likes.like,
+            'likes': likes_count,
+        })
+    return redirect('posts:post_detail', post_id=post.pk)
+
+
+@require_POST
+def post_like(request, post_id):
+    return like_response(request, post_id, likes.like)
+
+
+@require_POST
+def post_unlike(request, post_id):
+    return like_response(request, post_id, likes.unlike)
+
+
+@require_GET
+def new_posts(request):
+    """Число новых постов в лентах с последнего просмотра, до «99+»."""
+    if not request.user.is_authenticated:
+        return JsonResponse({'error': 'Требуется авторизация'}, status=401)
+    return JsonResponse(last_seen.new_posts(request))
+
+
+@require_GET
+def like_state(request):
+    """Лайки постов из ``?posts=1,2`` и отметки текущего пользователя."""
+    post_ids = [
+        post_id for post_id in map(
+            parse_id, request.GET.get('posts', '').split(',')
+        )
+        if post_id is not None
+    ][:NUM_LIKE_STATE]
+    states = likes.like_states(request.user, post_ids)
+    return JsonResponse({
+        str(post_id): state for post_id, state in states.items()
+    })
+
+
+@login_required
+@require_POST
+def profile_mute(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        mutes.mute(request, author=author)
+    return redirect('posts:profile', username)
+
+
+@login_required
+@require_POST
+def profile_unmute(request, username):
+    author = get_object_or_404(User, username=username)
+    mutes.unmute(request, author=author)
+    return redirect('posts:profile', username)
+
+
+@login_required
+@require_POST
+def group_mute(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    mutes.mute(request, group=group)
+    return redirect('posts:group_list', slug)
+
+
+@login_required
+@require_POST
+def group_unmute(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    mutes.unmute(request, group=group)
+    return redirect('posts:group_list', slug)
+
+
+@require_POST
+def follow_api(request, username):
+    return follow_response(request, username, follow=True)
+
+
+@require_POST
+def unfollow_api(request, username):
+    return follow_response(request, username, follow=False)
+
+
+@require_GET
+def follow_state(request):
+    """Подписан ли пользователь на авторов из ``?authors=a,b``."""
+    names = [
+        name for name in request.GET.get('authors', '').split(',') if name
+    ][:NUM_FOLLOW_STATE]
+    following = set()
+    if request.user.is_authenticated and names:
+        following = set(
+            Follow.objects.filter(
+                user=request.user, author__username__in=names
+            ).values_list('author__username', flat=True)
+        )
+    return JsonResponse({name: name in following for name in names})
+
+
+def month_range(year, month):
+    try:
+        start = timezone.make_aware(datetime(year, month, 1))
+        end = start.replace(year=year + month // 12, month=month % 12 + 1)
+    except (ValueError, OverflowError):
+        raise Http404
+    return start, end
+
+
+def render_archive(request, context, posts, rollup, url_name, url_args,
+                   year=None, month=None):
+    """Общая часть архивов: месяцы берутся из помесячной сводки,
+    посты месяца — по индексу на дату публикации.
+    """
+    # У последнего месяца года 9999 нет конца диапазона.
+    if year is not None and not 1 <= year < datetime.max.year:
+        raise Http404
+    if month is not None:
+        start, end = month_range(year, month)
+        context['month'] = start
+        context['page_obj'] = paginator(
+            request,
+            posts.filter(pub_date__gte=start, pub_date__lt=end)
+            .select_related('author', 'group')
+        )
+    else:
+        months = archive_months(**rollup)
+        if year is not None:
+            months = months.filter(month__year=year)
+        context['months'] = [
+            {
+                'month': row['month'],
+                'total': row['total'],
+                'url': reverse(url_name + '_month', args=(
+                    *url_args, row['month'].year, row['month'].month
+                )),
+                'year_url': reverse(
+                    url_name + '_year', args=(*url_args, row['month'].year)
+                ),
+            }
+            for row in months
+        ]
+    context['year'] = year
+    return render(request, 'posts/archive.html', context)
+
+
+def archive(request, year=None, month=None):
+    return render_archive(
+        request, {}, Post.objects.all(), {}, 'posts:archive', (),
+        year, month
+    )
+
+
+def group_archive(request, slug, year=None, month=None):
+    group = get_object_or_404(Group, slug=slug)
+    return render_archive(
+        request, {'group': group}, group.posts.all(), {'group': group},
+        'posts:group_archive', (group.slug,), year, month
+    )
+
+
+def profile_archive(request, username, year=None, month=None):
+    author = get_object_or_404(User, username=username)
+    return render_archive(
+        request, {'author': author}, author.posts.all(), {'author': author},
+        'posts:profile_archive', (author.username,), year, month
+    )
+
+
+def sitemap_index(request):
+    shards = [
+        (section, shard)
+        for section in SECTIONS
+        for shard in range(shard_count(section))
+    ]
+    context = {
+        'shards': shards,
+        'base_url': request.build_absolute_uri('/')[:-1],
+    }
+    return render(
+        request, 'posts/sitemap_index.xml', context,
+        content_type='application/xml'
+    )
+
+
+def sitemap_section(request, section, shard):
+    if section not in SECTIONS:
+        raise Http404
+    base_url = request.build_absolute_uri('/')[:-1]
+    return StreamingHttpResponse(
+        render_shard(section, shard, base_url),
+        content_type='application/xml'
+    )
+
+
+def ready(request):
+    """Готовность воркера: 503, пока идёт прогрев кэша."""
+    is_warm = is_ready()
+    return JsonResponse({'ready': is_warm}, status=200 if is_warm else 503)
@@ -0,0 +1,130 @@
+"""Прогрев кэшей после деплоя или перезапуска воркера.
+
+Первые страницы ленты, самые крупные группы и самые активные авторы
+рендерятся в пуле потоков: view вызывается напрямую для анонимного
+запроса из ``RequestFactory``, без middleware. Так заполняются кэш
+фрагментов, KVStore и файлы миниатюр. Пока прогрев идёт, ``is_ready()``
+возвращает False, и эндпоинт готовности отвечает 503. Флаг прогрева
+свой у каждого процесса: иначе при общем кэше один воркер снимал бы
+флаг, пока другие ещё греются. ``LocMemCache`` у каждого процесса тоже
+свой, поэтому для него прогрев нужно запускать внутри воркера
+(``post_fork`` или ``WARMUP_ON_START``), а команда ``warm_cache``
+полезна для общих кэшей и миниатюр.
+"""
+import logging
+import os
+import threading
+from importlib import import_module
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Sum
+from django.http import Http404
+from django.urls import resolve, reverse
+
+from .models import Group, MonthlyPostCount
+
+logger = logging.getLogger(__name__)
+
+WARMUP_KEY = 'warmup:running:{}'
+# Если процесс упадёт посреди прогрева, флаг не заблокирует готовность
+# навсегда.
+WARMUP_TIMEOUT: int = 60 * 5
+INDEX_PAGES: int = 5
+HOT_GROUPS: int = 10
+HOT_PROFILES: int = 10
+WORKERS: int = 4
+
+
+def warmup_key():
+    return WARMUP_KEY.format(os.getpid())
+
+
+def warmup_urls(pages=INDEX_PAGES, groups=HOT_GROUPS, profiles=HOT_PROFILES):
+    urls = [reverse('posts:index')]
+    urls += [
+        f"{reverse('posts:index')}?page={page}"
+        for page in range(2, pages + 1)
+    ]
+    # Обе выборки идут по индексам сводок, а не по таблице постов.
+    slugs = (
+        Group.objects.order_by('-posts_count', '-id')
+        .values_list('slug', flat=True)[:groups]
+    )
+    urls += [
+        reverse('posts:group_list', kwargs={'slug': slug}) for slug in slugs
+    ]
+    authors = (
+        MonthlyPostCount.objects.values('author__username')
+        .annotate(total=Sum('count'))
+        .order_by('-total')
+        .values_list('author__username', flat=True)[:profiles]
+    )
+    urls += [
+        reverse('posts:profile', kwargs={'username': username})
+        for username in authors
+    ]
+    return urls
+
+
+def fetch(url):
+    # django.test тянет за собой много модулей, а нужен только здесь.
+    from django.test import RequestFactory
+
+    hosts = [host.lstrip('.') for host in settings.ALLOWED_HOSTS]
+    extra = {'HTTP_HOST': hosts[0]} if hosts and hosts[0] != '*' else {}
+    request = RequestFactory(**extra).get(url)
+    request.user = AnonymousUser()
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore()
+    match = resolve(request.path_info)
+    try:
+        return match.func(request, *match.args, **match.kwargs).status_code
+    except Http404:
+        return 404
+    finally:
+        # У каждого потока своё соединение с БД.
+        connection.close()
+
+
+def warm_cache(urls=None, workers=WORKERS):
+    """Запрашивает ``urls`` в пуле потоков; возвращает {url: статус}."""
+    cache.set(warmup_key(), True, WARMUP_TIMEOUT)
+    try:
+        if urls is None:
+            urls = warmup_urls()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(urls, pool.map(fetch, urls)))
+    finally:
+        cache.delete(warmup_key())
+
+
+def is_ready():
+    return not cache.get(warmup_key())
+
+
+def start_background_warmup():
+    """Прогревает кэш воркера в фоне; готовность — по ``is_ready``."""
+    cache.set(warmup_key(), True, WARMUP_TIMEOUT)
+
+    def run():
+        try:
+            warm_cache()
+        except Exception:
+            logger.exception('Cache warm-up failed')
+            cache.delete(warmup_key())
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=run, name='warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def post_fork(server, worker):
+    """Хук gunicorn для запуска с ``--preload``: в конфиге
+    ``from posts.warmup import post_fork``.
+    """
+    start_background_warmup()
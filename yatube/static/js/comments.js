@@ -0,0 +1,39 @@
+// Отправка комментария без перезагрузки страницы: сервер возвращает
+// только HTML нового комментария. Без JS форма работает как обычно.
+(function () {
+  'use strict';
+
+  document.addEventListener('DOMContentLoaded', function () {
+    var form = document.querySelector('[data-comment-form]');
+    var list = document.getElementById('comments');
+    // Ответ встаёт внутрь ветки, поэтому его форма отправляется обычно.
+    if (!form || !list || form.querySelector('[name=parent]')) {
+      return;
+    }
+    form.addEventListener('submit', function (event) {
+      event.preventDefault();
+      var button = form.querySelector('[type=submit]');
+      button.disabled = true;
+      fetch(form.action, {
+        method: 'POST',
+        body: new FormData(form),
+        credentials: 'same-origin',
+        headers: {'X-Requested-With': 'XMLHttpRequest'}
+      }).then(function (response) {
+        if (response.redirected) {
+          // Сессия истекла: обычный переход на страницу входа.
+          window.location = response.url;
+          return null;
+        }
+        return response.ok ? response.text() : null;
+      }).then(function (html) {
+        if (html) {
+          list.insertAdjacentHTML('beforeend', html);
+          form.reset();
+        }
+      }).finally(function () {
+        button.disabled = false;
+      });
+    });
+  });
+}());
@@ -0,0 +1,81 @@
+// Кнопки подписки без перезагрузки страницы. Без JS работают обычные
+// ссылки profile_follow/profile_unfollow.
+(function () {
+  'use strict';
+
+  function csrfToken() {
+    var match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+    return match ? decodeURIComponent(match[1]) : '';
+  }
+
+  function render(button, following) {
+    button.dataset.following = following ? 'true' : 'false';
+    button.textContent = following ? 'Отписаться' : 'Подписаться';
+    button.classList.toggle('btn-light', following);
+    button.classList.toggle('btn-primary', !following);
+    button.href = following ? button.dataset.unfollowHref : button.dataset.followHref;
+  }
+
+  function toggle(event) {
+    var button = event.currentTarget;
+    var following = button.dataset.following === 'true';
+    event.preventDefault();
+    fetch(following ? button.dataset.unfollowApi : button.dataset.followApi, {
+      method: 'POST',
+      credentials: 'same-origin',
+      headers: {'X-CSRFToken': csrfToken()}
+    }).then(function (response) {
+      if (!response.ok) {
+        window.location = button.href;
+        return null;
+      }
+      return response.json();
+    }).then(function (data) {
+      if (!data) {
+        return;
+      }
+      render(button, data.following);
+      var counter = document.querySelector(
+        '[data-followers="' + button.dataset.followAuthor + '"]'
+      );
+      if (counter) {
+        counter.textContent = data.followers;
+      }
+    });
+  }
+
+  // Состояние кнопок без data-following запрашивается одним запросом.
+  function loadStates(buttons, stateUrl) {
+    var unknown = buttons.filter(function (button) {
+      return !button.dataset.following;
+    });
+    if (!unknown.length) {
+      return;
+    }
+    var authors = unknown.map(function (button) {
+      return encodeURIComponent(button.dataset.followAuthor);
+    });
+    fetch(stateUrl + '?authors=' + authors.join(','), {
+      credentials: 'same-origin'
+    }).then(function (response) {
+      return response.ok ? response.json() : {};
+    }).then(function (states) {
+      unknown.forEach(function (button) {
+        render(button, Boolean(states[button.dataset.followAuthor]));
+      });
+    });
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    var buttons = Array.prototype.slice.call(
+      document.querySelectorAll('[data-follow-author]')
+    );
+    buttons.forEach(function (button) {
+      button.addEventListener('click', toggle);
+    });
+    var script = document.querySelector('script[data-follow-state]');
+    if (script) {
+      loadStates(buttons, script.dataset.followState);
+    }
+  });
+}());
@@ -0,0 +1,73 @@
+// Лайки постов. Состояние скрытых панелей из кэшированных карточек
+// запрашивается одним запросом на страницу.
+(function () {
+  'use strict';
+
+  function csrfToken() {
+    var match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+    return match ? decodeURIComponent(match[1]) : '';
+  }
+
+  function render(bar, state) {
+    var button = bar.querySelector('button');
+    bar.dataset.liked = state.liked ? 'true' : 'false';
+    bar.action = state.liked ? bar.dataset.unlikeUrl : bar.dataset.likeUrl;
+    button.classList.toggle('btn-danger', state.liked);
+    button.classList.toggle('btn-outline-danger', !state.liked);
+    bar.querySelector('[data-like-count]').textContent = state.likes;
+    bar.hidden = false;
+  }
+
+  function toggle(event) {
+    var bar = event.currentTarget;
+    event.preventDefault();
+    fetch(bar.action, {
+      method: 'POST',
+      credentials: 'same-origin',
+      headers: {
+        'X-CSRFToken': csrfToken(),
+        'X-Requested-With': 'XMLHttpRequest'
+      }
+    }).then(function (response) {
+      return response.status === 401 || response.ok ? response.json() : null;
+    }).then(function (state) {
+      if (state && state.login) {
+        window.location = state.login + '?next=' +
+          encodeURIComponent(window.location.pathname);
+      } else if (state) {
+        render(bar, state);
+      }
+    });
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    var bars = Array.prototype.slice.call(
+      document.querySelectorAll('[data-like-post]')
+    );
+    bars.forEach(function (bar) {
+      bar.addEventListener('submit', toggle);
+    });
+    var unknown = bars.filter(function (bar) {
+      return !bar.dataset.liked;
+    });
+    var script = document.querySelector('script[data-like-state]');
+    if (!unknown.length || !script) {
+      return;
+    }
+    var ids = unknown.map(function (bar) {
+      return bar.dataset.likePost;
+    });
+    fetch(script.dataset.likeState + '?posts=' + ids.join(','), {
+      credentials: 'same-origin'
+    }).then(function (response) {
+      return response.ok ? response.json() : {};
+    }).then(function (states) {
+      unknown.forEach(function (bar) {
+        var state = states[bar.dataset.likePost];
+        if (state) {
+          render(bar, state);
+        }
+      });
+    });
+  });
+}());
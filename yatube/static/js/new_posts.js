@@ -0,0 +1,37 @@
+// Обновляет счётчики новых постов в шапке без перезагрузки ленты.
+(function () {
+  'use strict';
+
+  var INTERVAL = 60 * 1000;
+
+  function poll(url) {
+    if (document.hidden) {
+      return;
+    }
+    fetch(url, {credentials: 'same-origin'}).then(function (response) {
+      return response.ok ? response.json() : null;
+    }).then(function (counts) {
+      if (!counts) {
+        return;
+      }
+      Object.keys(counts).forEach(function (feed) {
+        var badge = document.querySelector('[data-new-posts="' + feed + '"]');
+        if (badge) {
+          badge.textContent = counts[feed];
+        }
+      });
+    });
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    var script = document.querySelector('script[data-new-posts-url]');
+    if (!script) {
+      return;
+    }
+    // Если в кэше сервера счётчиков не было, шапка пришла пустой.
+    if (!('newPostsCached' in script.dataset)) {
+      poll(script.dataset.newPostsUrl);
+    }
+    window.setInterval(poll, INTERVAL, script.dataset.newPostsUrl);
+  });
+}());
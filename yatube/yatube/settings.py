@@ -47,20 +47,26 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
     'sorl.thumbnail',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.PrecompressedStaticMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
+    'core.middleware.RateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# Панель отладки подключается только в режиме отладки: в боевом
+# воркере её импорт лишь замедляет старт.
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
@@ -79,6 +85,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.new_posts.new_posts',
             ],
         },
     },
@@ -143,6 +150,13 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+# Хэшированные имена и .gz/.br копии нужны только собранной статике;
+# в режиме отладки файлы отдаются из STATICFILES_DIRS как есть.
+if not DEBUG:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
@@ -159,8 +173,59 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+# Общий для всех воркеров кэш (memcached, адреса через запятую). Без
+# него у каждого процесса свой LocMemCache, и всё, что должно быть
+# согласовано между воркерами (сессии, пользователь, лимиты), в кэше
+# не хранится.
+MEMCACHED_LOCATION = os.getenv('MEMCACHED_LOCATION', '')
+SHARED_CACHE = bool(MEMCACHED_LOCATION)
+
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': MEMCACHED_LOCATION.split(','),
+        }
+    }
+    # Сессия читается из кэша, а в БД пишется при изменении.
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
     }
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+
+# Буфер просмотров постов сбрасывается в БД по достижении порога
+# или по истечении интервала (в секундах).
+VIEW_COUNTER_FLUSH_THRESHOLD = 100
+VIEW_COUNTER_FLUSH_INTERVAL = 30
+
+# Прогревать кэш в фоне при загрузке WSGI-приложения в каждом воркере.
+WARMUP_ON_START = False
+
+# Лимиты запросов на запись: имя URL -> (частота, методы).
+RATELIMITS = {
+    'posts:post_create': ('10/m', ('POST',)),
+    'posts:add_comment': ('30/m', ('POST',)),
+    'posts:profile_follow': ('60/m', ('GET', 'POST')),
+    'posts:follow_api': ('60/m', ('POST',)),
+    'posts:unfollow_api': ('60/m', ('POST',)),
+    'posts:post_like': ('120/m', ('POST',)),
+    'posts:post_unlike': ('120/m', ('POST',)),
+    'users:signup': ('5/h', ('POST',)),
 }
+
+# При средней задержке записи выше порога (в секундах) эти URL
+# отвечают 503, пока нагрузка не спадёт.
+OVERLOAD_WRITE_LATENCY = 0.5
+OVERLOAD_RETRY_AFTER = 30
+OVERLOAD_SHED = (
+    'posts:add_comment',
+    'posts:profile_follow',
+    'posts:follow_api',
+    'posts:unfollow_api',
+    'posts:post_like',
+    'posts:post_unlike',
+)